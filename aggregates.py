@@ -0,0 +1,109 @@
+"""Per-table aggregates computed once when a snapshot is published.
+
+Callbacks read these instead of rescanning the DataFrame. To add a metric to
+the pick-rate-weighted means, append it to ``WEIGHTED_MEAN_METRICS``; to add a
+new kind of aggregate, register a function with ``@aggregate('name')``. Row
+masks are aligned with the snapshot's DataFrame and must not be modified.
+"""
+import numpy as np
+
+from config import default_roles_mapping
+
+WEIGHTED_MEAN_METRICS = ['Win Rate', 'TOP 3', 'RP Gain', 'Average TK', 'Win Rate / Top 3']
+SLIDER_QUANTILES = [0.25, 0.5, 0.75]
+
+AGGREGATES = {}
+
+
+def aggregate(name):
+    def register(function):
+        AGGREGATES[name] = function
+        return function
+    return register
+
+
+@aggregate('weighted_mean')
+def weighted_means(df):
+    # Pick-rate-weighted mean of each metric, 0 when nobody is picked
+    weights = df['Pick Rate'].to_numpy(dtype=float)
+    total = weights.sum()
+    means = {}
+    for metric in WEIGHTED_MEAN_METRICS:
+        means[metric] = float((weights * df[metric].to_numpy(dtype=float)).sum() / total) if total != 0 else 0
+    return means
+
+
+@aggregate('pick_rate')
+def pick_rate_summary(df):
+    pick_rate = df['Pick Rate']
+    if len(df) == 0:
+        return {'min': 0, 'max': 1, 'min_character': '', 'max_character': '', 'quantiles': {}}
+
+    # Closest character for each slider quantile
+    values = pick_rate.to_numpy(dtype=float)
+    characters = df['Character'].to_numpy()
+    quantiles = {}
+    for value in pick_rate.quantile(SLIDER_QUANTILES).to_numpy():
+        quantiles[float(value)] = characters[np.abs(values - value).argmin()]
+
+    return {
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'min_character': characters[values.argmin()],
+        'max_character': characters[values.argmax()],
+        'quantiles': quantiles,
+    }
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+@aggregate('characters')
+def character_names(df):
+    # Object array of names; Arrow-backed string columns would build new str objects on every to_numpy
+    return _read_only(df['Character'].to_numpy(dtype=object))
+
+
+@aggregate('pick_rate_order')
+def pick_rate_order(df):
+    # Rows by descending pick rate (ties in reverse row order), the label placement order
+    return _read_only(df['Pick Rate'].to_numpy().argsort(kind='stable')[::-1].copy())
+
+
+@aggregate('role_masks')
+def role_masks(df):
+    # Boolean row mask of every predefined role
+    characters = df['Character']
+    return {role: _read_only(characters.isin(members).to_numpy())
+            for role, members in default_roles_mapping.items() if role not in ('Reference', 'User Defined')}
+
+
+@aggregate('reference_masks')
+def reference_masks(df):
+    # Rows whose name contains each Reference name, the building blocks of user defined groups
+    characters = df['Character']
+    return {name: _read_only(characters.str.contains(name, regex=False).to_numpy()) for name in default_roles_mapping['Reference']}
+
+
+def highlight_mask(df, aggregates, role, characters):
+    """Rows of ``df`` to highlight for ``role``, ``characters`` being the session's list for it.
+
+    User defined groups keep the substring match of the original lambda
+    (``any(item in name for item in characters)``); names outside the
+    Reference list fall back to a string scan.
+    """
+    if role == 'Whole':
+        return None
+    if role != 'User Defined':
+        return aggregates['role_masks'][role]
+    mask = np.zeros(len(df), dtype=bool)
+    for item in characters:
+        member = aggregates['reference_masks'].get(item)
+        mask |= member if member is not None else df['Character'].str.contains(item, regex=False).to_numpy()
+    return mask
+
+
+def compute_aggregates(df):
+    return {name: function(df) for name, function in AGGREGATES.items()}
@@ -0,0 +1,103 @@
+// Clientside callbacks for run.py (used when CLIENTSIDE_FILTERING is on).
+// The server sends the whole table of one (tier, version, comparison) once as
+// figure-data; slider drags and role changes are redrawn here without a request.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    er_plot: {
+        slider_text: function(value) {
+            return '선택된 유효 픽률 범위: ' + value[0].toFixed(2) + '% ~ ' + value[1].toFixed(2) + '%';
+        },
+
+        fetch_figure_data: function(version, tier, comparison, generation) {
+            // A plain GET, so a view seen before is revalidated by ETag instead of resent
+            var query = new URLSearchParams({tier: tier, version: version, comparison: comparison});
+            function attempt(retries) {
+                return fetch('figure-data?' + query.toString(), {credentials: 'same-origin'})
+                    .then(function(response) {
+                        // 503 while the server has no data yet: wait as long as it asks and try again
+                        if (response.status === 503 && retries > 0) {
+                            var seconds = parseInt(response.headers.get('Retry-After'), 10) || 3;
+                            return new Promise(function(resolve) { setTimeout(resolve, seconds * 1000); })
+                                .then(function() { return attempt(retries - 1); });
+                        }
+                        if (!response.ok) {
+                            throw new Error('figure-data: HTTP ' + response.status);
+                        }
+                        return response.json();
+                    });
+            }
+            return attempt(20)
+                .catch(function(error) {
+                    console.error(error);
+                    return window.dash_clientside.no_update;
+                });
+        },
+
+        reload_when_ready: function(n) {
+            // The "data loading" page polls /ready and swaps itself for the app once there is data
+            return fetch('ready', {credentials: 'same-origin', cache: 'no-store'})
+                .then(function(response) {
+                    if (response.ok) {
+                        window.location.reload();
+                        return true;
+                    }
+                    return window.dash_clientside.no_update;
+                })
+                .catch(function() { return window.dash_clientside.no_update; });
+        },
+
+        filter_figure: function(data, selectedRange, role, confirmFlag, sessionRolesMapping, roleConfig) {
+            if (!data) {
+                return window.dash_clientside.no_update;
+            }
+            // The session store only holds the user defined group
+            var group = (role === 'User Defined' ? (sessionRolesMapping || {})[role] : roleConfig.mapping[role]) || [];
+            var points = data.points;
+
+            // Same membership rules as the server: user defined groups match by substring
+            var isMember;
+            if (role === 'Whole') {
+                isMember = function() { return false; };
+            } else if (role === 'User Defined') {
+                isMember = function(name) {
+                    return group.some(function(item) { return name.indexOf(item) !== -1; });
+                };
+            } else {
+                isMember = function(name) { return group.indexOf(name) !== -1; };
+            }
+
+            var rest = [], highlighted = [];
+            for (var i = 0; i < points.pick_rate.length; i++) {
+                var pickRate = points.pick_rate[i];
+                if (pickRate < selectedRange[0] || pickRate > selectedRange[1]) {
+                    continue;
+                }
+                (isMember(points.text[i]) ? highlighted : rest).push(i);
+            }
+
+            function buildTrace(indices, name, color) {
+                var trace = Object.assign({}, data.trace, {
+                    name: name,
+                    legendgroup: name,
+                    marker: Object.assign({}, data.trace.marker, {color: color}),
+                });
+                ['x', 'y', 'text', 'textposition', 'customdata'].forEach(function(key) {
+                    if (points[key]) {
+                        trace[key] = indices.map(function(i) { return points[key][i]; });
+                    }
+                });
+                trace.marker.size = indices.map(function(i) { return points.size[i]; });
+                return trace;
+            }
+
+            // '전체' first so the highlighted role is drawn on top, as on the server
+            var traces = [];
+            if (rest.length) {
+                traces.push(buildTrace(rest, roleConfig.translation.Whole, data.colors.rest));
+            }
+            if (highlighted.length) {
+                traces.push(buildTrace(highlighted, roleConfig.translation[role], data.colors.highlight));
+            }
+            return {data: traces, layout: data.layout};
+        }
+    }
+});
@@ -0,0 +1,91 @@
+"""Bytes sent to one browser session, with and without compression and ETags.
+
+A scripted session (page load, a round of dropdown changes, then back to
+views already seen) is replayed against the app in process with the Flask
+test client, over a synthetic snapshot. "plain" is a client that accepts no
+compression and keeps no HTTP cache; "compressed" accepts gzip (and brotli
+when installed); "compressed+etag" also revalidates figure-data with
+If-None-Match, as the browser's HTTP cache does.
+
+    python benchmarks/bandwidth.py
+    python benchmarks/bandwidth.py --rows 1000
+"""
+import os
+import re
+import sys
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_test import prepare_store, slider_request  # noqa: E402
+
+# (tier, version, comparison) in the order a user looks at them; the last ones are revisits
+SESSION_VIEWS = [
+    ('platinum_plus', 'currentPatch', 'top3_vs_winrate'),
+    ('platinum_plus', 'currentPatch', 'pick_vs_win'),
+    ('platinum_plus', 'currentPatch', 'pick_vs_rp'),
+    ('diamond_plus', 'currentPatch', 'pick_vs_rp'),
+    ('diamond_plus', 'prevPatch', 'pick_vs_rp'),
+    ('diamond_plus', 'currentPatch', 'pick_vs_rp'),
+    ('platinum_plus', 'currentPatch', 'pick_vs_rp'),
+    ('platinum_plus', 'currentPatch', 'top3_vs_winrate'),
+    ('platinum_plus', 'currentPatch', 'pick_vs_win'),
+]
+
+
+def replay_session(client, accept_encoding, conditional):
+    """Return ``{'page load': bytes, 'figure-data': bytes, 'callbacks': bytes}`` received."""
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    received = {'page load': 0, 'figure-data': 0, 'callbacks': 0}
+
+    index = client.get('/', headers=headers)
+    received['page load'] += len(index.data)
+    scripts = re.findall(r'src="([^"]+)"', client.get('/').get_data(as_text=True))
+    for path in ['/_dash-layout', '/_dash-dependencies'] + [src for src in scripts if src.startswith('/')]:
+        received['page load'] += len(client.get(path, headers=headers).data)
+
+    etags = {}
+    for tier, version, comparison in SESSION_VIEWS:
+        path = f"/figure-data?tier={tier}&version={version}&comparison={comparison}"
+        request_headers = dict(headers)
+        if conditional and path in etags:
+            request_headers['If-None-Match'] = etags[path]
+        response = client.get(path, headers=request_headers)
+        assert response.status_code in (200, 304), response.status_code
+        etags[path] = response.headers.get('ETag')
+        received['figure-data'] += len(response.data)
+        response = client.post('/_dash-update-component', json=slider_request(tier, version)[2], headers=headers)
+        assert response.status_code == 200, response.status_code
+        received['callbacks'] += len(response.data)
+    return received
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=300, help='rows per synthetic table')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        prepare_store(directory, args.rows)
+        os.chdir(directory)
+        with contextlib.redirect_stdout(sys.stderr):
+            import run
+            from compression import brotli
+            from live_data import reload_snapshot_store
+            reload_snapshot_store()
+        client = run.server.test_client()
+
+        accept = 'gzip, br' if brotli is not None else 'gzip'
+        modes = [('plain', None, False), ('compressed', accept, False), ('compressed+etag', accept, True)]
+        print(f"{'client':>16} {'page load (KB)':>15} {'figure-data (KB)':>17} {'callbacks (KB)':>15} {'total (KB)':>11}")
+        for name, accept_encoding, conditional in modes:
+            received = replay_session(client, accept_encoding, conditional)
+            total = sum(received.values())
+            print(f"{name:>16} {received['page load'] / 1024:>15.1f} {received['figure-data'] / 1024:>17.1f} "
+                  f"{received['callbacks'] / 1024:>15.1f} {total / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
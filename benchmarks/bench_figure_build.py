@@ -0,0 +1,116 @@
+"""Compare plot.scatter_figure with the plotly.express path it replaced.
+
+Reports build time (including JSON serialization, as Dash does) and payload
+size for each point count, and the scattergl variant of the lean builder.
+
+    python benchmarks/bench_figure_build.py
+    python benchmarks/bench_figure_build.py --sizes 100 1000 10000 --comparison pick_vs_win
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aggregates import compute_aggregates  # noqa: E402
+from plot import COMPARISONS, marker_sizes, scatter_figure  # noqa: E402
+from label_placement import place_labels  # noqa: E402
+
+
+def adjust_text_position(df, x_col, y_col, text_col):
+    # Label placement as the px path did it, over a filtered copy of the table
+    order = df['Pick Rate'].to_numpy().argsort(kind='stable')[::-1]
+    placed = place_labels(df[x_col].to_numpy()[order], df[y_col].to_numpy()[order], df[text_col].to_numpy()[order])
+    positions = [None] * len(df)
+    for index, position in zip(order, placed):
+        positions[index] = position
+    return positions
+
+
+def legacy_figure(filtered_df, comparison, aggregates, role_name):
+    # The plot_* functions before the lean builder: px.scatter, add_hline/add_vline,
+    # update_traces, the per-trace textposition loop and customize_plot
+    spec = COMPARISONS[comparison]
+    custom_data = [filtered_df['Pick Rate']] if spec['pick_rate_customdata'] else None
+    fig = px.scatter(filtered_df, x=spec['x'], y=spec['y'], text='Character', size=marker_sizes(filtered_df['Pick Rate'], aggregates),
+                     color='역할군', color_discrete_map={role_name: 'Crimson', '전체': 'LightSkyBlue'},
+                     custom_data=custom_data)
+    for axis, metric, text, position, color in spec['lines']:
+        value = aggregates['weighted_mean'][metric]
+        add_line = fig.add_hline if axis == 'h' else fig.add_vline
+        add_line(value, line_dash='dot', annotation_text=text.format(value), annotation_position=position,
+                 line_color=color, annotation_font={'size': 12, 'color': color})
+    fig.update_layout(xaxis_title=spec['x_title'], yaxis_title=spec['y_title'], plot_bgcolor='white', hovermode='closest')
+
+    position_by_text = dict(zip(filtered_df['Character'], adjust_text_position(filtered_df, spec['x'], spec['y'], 'Character')))
+    for trace in fig.data:
+        trace.update(textposition=[position_by_text[text] for text in trace.text])
+    fig.update_traces(hovertemplate=spec['hovertemplate'])
+    if not spec['pick_rate_customdata']:
+        fig.update_traces(hoverinfo='text')
+
+    fig.update_xaxes(showgrid=True, gridwidth=0.5, gridcolor='WhiteSmoke')
+    fig.update_yaxes(showgrid=True, gridwidth=0.5, gridcolor='WhiteSmoke')
+    fig.update_layout(margin=dict(l=40, r=40, t=40, b=40), paper_bgcolor='white', plot_bgcolor='white')
+    fig.update_layout(legend=dict(orientation='h', yanchor='bottom', y=1, xanchor='left', x=0.01,
+                                  bgcolor='GhostWhite', bordercolor='LightSteelBlue', borderwidth=1))
+    fig.update_layout(legend_title_text='', dragmode='pan')
+    return fig
+
+
+def synthetic_table(n, seed=0):
+    rng = np.random.default_rng(seed)
+    top3 = rng.normal(35, 5, n)
+    win_rate = rng.normal(13, 3, n)
+    return pd.DataFrame({
+        'Character': [f"무기{i % 23} 캐릭터{i}" for i in range(n)],
+        'RP Gain': rng.normal(10, 8, n),
+        'Pick Rate': rng.gamma(2.0, 0.5, n),
+        'Win Rate': win_rate,
+        'TOP 3': top3,
+        'Average TK': rng.normal(6, 1, n),
+        'Win Rate / Top 3': win_rate / top3 * 100,
+    })
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--comparison', default='top3_vs_winrate', choices=sorted(COMPARISONS))
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'builder':>10} {'build (s)':>10} {'payload (KB)':>13}")
+    for n in args.sizes:
+        df = synthetic_table(n)
+        aggregates = compute_aggregates(df)
+        # Highlight every fifth character, as a role selection would
+        highlight = np.arange(n) % 5 == 0
+        legacy_df = df.assign(역할군=np.where(highlight, '탱커', '전체')).sort_values('역할군', key=lambda s: s == '전체', ascending=False)
+
+        runs = [
+            ('express', lambda: legacy_figure(legacy_df, args.comparison, aggregates, '탱커').to_json()),
+            ('lean', lambda: json.dumps(scatter_figure(df, args.comparison, aggregates, None, highlight, '탱커', 'svg'), ensure_ascii=False)),
+            ('lean-gl', lambda: json.dumps(scatter_figure(df, args.comparison, aggregates, None, highlight, '탱커', 'webgl'), ensure_ascii=False)),
+        ]
+        for name, build in runs:
+            elapsed, payload = best_of(build, args.repeat)
+            print(f"{n:>8} {name:>10} {elapsed:>10.4f} {len(payload.encode('utf-8')) / 1024:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
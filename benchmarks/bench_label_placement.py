@@ -0,0 +1,75 @@
+"""Compare label_placement.place_labels with the original O(n^2) adjust_text_position.
+
+    python benchmarks/bench_label_placement.py
+    python benchmarks/bench_label_placement.py --sizes 100 1000 --legacy-max 1000
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from label_placement import place_labels  # noqa: E402
+
+
+def legacy_adjust_text_position(points, texts):
+    # plot.adjust_text_position before the label placement engine, kept for comparison
+    positions = ['top center' for _ in range(len(points))]
+    text_box_width = max(len(text) for text in texts) * 0.02
+    text_box_height = 0.05
+    bounding_boxes = [(x - text_box_width / 2, y - text_box_height / 2,
+                       x + text_box_width / 2, y + text_box_height / 2) for x, y in points]
+
+    def boxes_overlap(box1, box2):
+        return not (box1[2] < box2[0] or box1[0] > box2[2] or
+                    box1[3] < box2[1] or box1[1] > box2[3])
+
+    for i, box1 in enumerate(bounding_boxes):
+        for j, box2 in enumerate(bounding_boxes):
+            if i != j and boxes_overlap(box1, box2):
+                positions[i] = 'bottom center' if points[i][1] < points[j][1] else 'top center'
+    return positions
+
+
+def synthetic_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Roughly the spread of the real TOP 3 / win rate scatter
+    x = rng.normal(35, 5, n)
+    y = rng.normal(45, 6, n)
+    texts = [f"무기{i % 23} 캐릭터{i % 97}" for i in range(n)]
+    return x, y, texts
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='Largest size the quadratic implementation is run at (about a minute at 10k)')
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'engine (s)':>12} {'legacy (s)':>12} {'speedup':>9}")
+    for n in args.sizes:
+        x, y, texts = synthetic_points(n)
+        engine = best_of(lambda: place_labels(x, y, texts), args.repeat)
+        if n <= args.legacy_max:
+            points = np.column_stack([x, y])
+            legacy = best_of(lambda: legacy_adjust_text_position(points, texts), 1 if n > 1000 else args.repeat)
+            print(f"{n:>8} {engine:>12.4f} {legacy:>12.4f} {legacy / engine:>8.1f}x")
+        else:
+            print(f"{n:>8} {engine:>12.4f} {'skipped':>12} {'':>9}")
+
+
+if __name__ == '__main__':
+    main()
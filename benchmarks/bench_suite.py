@@ -0,0 +1,197 @@
+"""Benchmark the parsing and plotting hot paths over synthetic rosters.
+
+For each roster size a dak.gg-shaped statistics table is rendered with the
+fixture server's generator, written to a temporary file and run through
+every stage, from parse_html to the serialized figure. Each stage is timed
+over several runs (median and percentiles), then run once more under
+tracemalloc for its peak allocation. Everything runs offline and in
+process: no browser, no network, no Dash server. The 50k roster takes a
+few minutes on its own, most of it in parse_html; pass ``--sizes`` for a
+quick run.
+
+Results can be saved as a JSON baseline and later runs compared with it;
+a stage whose median time or peak memory grew past the threshold is a
+regression and makes the script exit with status 1.
+
+    python benchmarks/bench_suite.py --save benchmarks/baseline.json
+    python benchmarks/bench_suite.py --compare benchmarks/baseline.json --threshold 0.25
+    python benchmarks/bench_suite.py --sizes 50 500 --stages parse_html update_slider
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = [50, 500, 5000, 50000]
+KEY = ('in_1000', 'currentPatch')
+COMPARISON = 'top3_vs_winrate'
+# Pick rate range and role of the figure stages: most of the table, with a highlighted role
+SELECTED_RANGE = (0.3, 10)
+ROLE = 'Tanker'
+
+
+def write_roster(n_rows, directory):
+    from fixture_server import synthetic_rows, render_table
+    path = os.path.join(directory, f"roster_{n_rows}.html")
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(render_table(synthetic_rows(n_rows)))
+    return path
+
+
+def roster_stages(path):
+    """``{stage: callable}`` for one roster; the table is parsed and published first."""
+    import run
+    import plot
+    from aggregates import compute_aggregates
+    from update_table import parse_html
+    from snapshot import publish
+    from figure_cache import figure_cache
+    from config import default_roles_mapping, url_mapping
+
+    df = parse_html(path)
+    snapshot = publish({KEY: df})
+    aggregates = snapshot.aggregates[KEY]
+    spec = plot.COMPARISONS[COMPARISON]
+    pick_rate = df['Pick Rate'].to_numpy()
+    rows = np.flatnonzero((pick_rate >= SELECTED_RANGE[0]) & (pick_rate <= SELECTED_RANGE[1]))
+    characters = default_roles_mapping[ROLE]
+
+    def update_figure():
+        # The cache-miss path of update_figure, whichever filtering mode is configured
+        figure = run.build_figure(snapshot, KEY[0], KEY[1], COMPARISON, ROLE, SELECTED_RANGE, characters)
+        return json.dumps(figure, ensure_ascii=False)
+
+    def small_multiples():
+        # The grid view: the roster stands in for every (tier, version) table
+        keys = list(url_mapping)
+        highlights = {key: aggregates['role_masks'][ROLE] for key in keys}
+        figure = plot.small_multiples_figure({key: df for key in keys}, {key: aggregates for key in keys}, keys,
+                                             COMPARISON, SELECTED_RANGE, highlights, ROLE)
+        return json.dumps(figure, ensure_ascii=False)
+
+    def figure_data():
+        figure_cache.clear()
+        return run.figure_data_json(snapshot, KEY[0], KEY[1], COMPARISON)
+
+    stages = {
+        'parse_html': lambda: parse_html(path),
+        'compute_aggregates': lambda: compute_aggregates(df),
+        'update_slider': lambda: run.update_slider(KEY[1], KEY[0], 'single'),
+        'label_positions': lambda: plot.label_positions(df[spec['x']].to_numpy(), df[spec['y']].to_numpy(),
+                                                        aggregates['characters'], rows, aggregates['pick_rate_order']),
+        'scatter_figure': lambda: plot.scatter_figure(df, COMPARISON, aggregates, rows),
+        'client_figure_data': lambda: plot.client_figure_data(df, COMPARISON, aggregates),
+        'update_figure': update_figure,
+        'small_multiples': small_multiples,
+    }
+    if hasattr(run, 'figure_data_json'):
+        stages['figure_data'] = figure_data
+    return stages
+
+
+def time_stage(function, repeat, budget):
+    # At least three runs, fewer than ``repeat`` once a stage has used up its time budget
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeat and (len(timings) < 3 or time.perf_counter() - started < budget):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def peak_memory(function):
+    # Starting tracemalloc afresh resets the peak (tracemalloc.reset_peak is Python 3.9+)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def summarise(timings, peak):
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    return {'runs': len(timings), 'min': min(timings), 'median': p50, 'p90': p90, 'p99': p99, 'peak_bytes': peak}
+
+
+def run_suite(sizes, stages, repeat, budget):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for n_rows in sizes:
+            path = write_roster(n_rows, directory)
+            # Publishing and the callbacks print nothing useful here
+            with contextlib.redirect_stdout(sys.stderr):
+                available = roster_stages(path)
+            for stage in stages:
+                if stage not in available:
+                    continue
+                function = available[stage]
+                function()  # warm up lazily built state
+                summary = summarise(time_stage(function, repeat, budget), peak_memory(function))
+                results[f"{stage}@{n_rows}"] = summary
+                print(f"{stage:>20} {n_rows:>7} {summary['median'] * 1000:>11.2f} {summary['p90'] * 1000:>9.2f} "
+                      f"{summary['p99'] * 1000:>9.2f} {summary['peak_bytes'] / 1024:>10.0f} {summary['runs']:>5}", flush=True)
+    return results
+
+
+# Growth smaller than this is run-to-run noise however large it is relative to the baseline
+NOISE_FLOOR = {'median': 0.002, 'peak_bytes': 16 * 1024}
+
+
+def compare(results, baseline, threshold):
+    """Return the ``(name, metric, baseline, current)`` that grew by more than ``threshold``."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, floor in NOISE_FLOOR.items():
+            if current[metric] > previous[metric] * (1 + threshold) and current[metric] - previous[metric] > floor:
+                regressions.append((name, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def main():
+    all_stages = ['parse_html', 'compute_aggregates', 'update_slider', 'label_positions', 'scatter_figure',
+                  'client_figure_data', 'update_figure', 'small_multiples', 'figure_data']
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--stages', nargs='+', default=all_stages, choices=all_stages)
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per stage')
+    parser.add_argument('--budget', type=float, default=10.0, help='seconds per stage before stopping early')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='baseline to check the results against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed growth over the baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    print(f"{'stage':>20} {'rows':>7} {'median (ms)':>11} {'p90 (ms)':>9} {'p99 (ms)':>9} {'peak (KB)':>10} {'runs':>5}")
+    results = run_suite(args.sizes, args.stages, args.repeat, args.budget)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results}, file, indent=2)
+        print(f"baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, previous, current in regressions:
+            print(f"REGRESSION {name} {metric}: {previous:.6g} -> {current:.6g} ({current / previous - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions past {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Check that the run.py callbacks stay within a per-call allocation budget.
+
+A synthetic snapshot is published, then each callback is run under
+tracemalloc and its peak allocation is compared with its budget. Callbacks
+that read the triggering input are posted to Dash's /_dash-update-component
+endpoint through the Flask test client, the way the browser calls them;
+the others are called directly. Budgets are bytes per table row plus a
+fixed allowance, which covers Dash's request handling for the posted ones,
+set so that one whole-table copy (about 110 bytes per row of the synthetic
+table) puts a callback over. Exits with status 1 if any callback is over
+budget.
+
+    python benchmarks/check_allocations.py
+    python benchmarks/check_allocations.py --rows 5000
+"""
+import os
+import sys
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_figure_build import synthetic_table  # noqa: E402
+
+# Fixed allowance of the posted callbacks; Dash's request handling takes about 75 KB of it
+HTTP_ALLOWANCE = 128 * 1024
+# Peak allocation allowed per call: (bytes per table row, fixed bytes)
+BUDGETS = {
+    # The figure itself is a few typed arrays and the label list
+    'build_figure': (160, 32 * 1024),
+    # Plain lists for the browser, plus the JSON kept in the figure cache
+    'figure_data': (1300, 64 * 1024),
+    'update_slider': (0, 16 * 1024),
+    'toggle_character': (0, HTTP_ALLOWANCE),
+    'reset_characters': (0, HTTP_ALLOWANCE),
+    'toggle_modal': (0, HTTP_ALLOWANCE),
+}
+
+
+def peak_allocation(function, *args):
+    # Starting tracemalloc afresh resets the peak (tracemalloc.reset_peak is Python 3.9+)
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def prop(component_id, prop_name, value=None):
+    return {'id': component_id, 'property': prop_name, 'value': value}
+
+
+def post_callback(client, dependencies, output, outputs, inputs, state, changed):
+    # The body the Dash renderer posts. The callback is looked up by its output key, taken
+    # from /_dash-dependencies because allow_duplicate outputs carry a hash in it.
+    body = {
+        'output': next(spec['output'] for spec in dependencies if output in spec['output']),
+        'outputs': outputs,
+        'inputs': inputs,
+        'state': state,
+        'changedPropIds': [changed],
+    }
+    response = client.post('/_dash-update-component', json=body)
+    if response.status_code not in (200, 204):
+        raise RuntimeError(f"{output}: HTTP {response.status_code} {response.get_data(as_text=True)[:200]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    args = parser.parse_args()
+
+    import run
+    from snapshot import publish
+    from figure_cache import figure_cache
+    from config import default_roles_mapping
+
+    df = synthetic_table(args.rows)
+    # Some rows carry real character names so the roles have members
+    names = [f"{weapon} {i}" for i, weapon in enumerate(default_roles_mapping['Tanker'])]
+    df.loc[:len(names) - 1, 'Character'] = names
+    for column in ['Average Rank', 'Damage', 'Player Kills', 'Animal Kills']:
+        df[column] = 0.0
+    snapshot = publish({('in_1000', 'currentPatch'): df})
+    session = {'User Defined': default_roles_mapping['Reference'][:10]}
+    client = run.server.test_client()
+    dependencies = client.get('/_dash-dependencies').get_json()
+    box = {'type': 'char-box', 'index': 3}
+    boxes = [{'type': 'char-box', 'index': i} for i in range(len(default_roles_mapping['Reference']))]
+
+    def toggle_character():
+        post_callback(client, dependencies, 'char-box', {'id': box, 'property': 'style'},
+                      [prop(box, 'n_clicks', 1)], [prop(box, 'style', {})],
+                      '{"index":3,"type":"char-box"}.n_clicks')
+
+    def reset_characters():
+        post_callback(client, dependencies, 'stored-selected-characters.data',
+                      [{'id': 'stored-selected-characters', 'property': 'data'},
+                       [{'id': box_id, 'property': 'style'} for box_id in boxes]],
+                      [prop('reset-modal', 'n_clicks', 1)],
+                      [prop('stored-selected-characters', 'data', session['User Defined'])],
+                      'reset-modal.n_clicks')
+
+    def toggle_modal():
+        post_callback(client, dependencies, 'modal-edit-user-defined-roles.is_open',
+                      [{'id': 'modal-edit-user-defined-roles', 'property': 'is_open'},
+                       {'id': 'confirm-click-flag', 'property': 'data'},
+                       {'id': 'role-dropdown', 'property': 'value'},
+                       {'id': 'session_roles_mapping', 'property': 'data'}],
+                      [prop('edit-user-defined-roles-button', 'n_clicks', 0), prop('confirm-modal', 'n_clicks', 1),
+                       prop('close-modal', 'n_clicks', 0)],
+                      [prop('modal-edit-user-defined-roles', 'is_open', True),
+                       prop('stored-selected-characters', 'data', ['아야']),
+                       prop('session_roles_mapping', 'data', session)],
+                      'confirm-modal.n_clicks')
+
+    def figure_data():
+        figure_cache.clear()
+        run.figure_data_json(snapshot, 'in_1000', 'currentPatch', 'top3_vs_winrate')
+
+    checks = {
+        'build_figure': lambda: run.build_figure(snapshot, 'in_1000', 'currentPatch', 'top3_vs_winrate', 'User Defined',
+                                                 (0.3, 10), session['User Defined']),
+        'update_slider': lambda: run.update_slider('currentPatch', 'in_1000', 'single'),
+        'toggle_character': toggle_character,
+        'reset_characters': reset_characters,
+        'toggle_modal': toggle_modal,
+    }
+    if hasattr(run, 'figure_data_json'):
+        checks['figure_data'] = figure_data
+
+    failed = False
+    print(f"table: {args.rows} rows, {df.memory_usage(deep=True).sum() / 1024:.0f} KB")
+    print(f"{'callback':>30} {'peak (KB)':>10} {'budget (KB)':>12}")
+    for name, function in checks.items():
+        function()  # warm up lazily built state
+        peak = peak_allocation(function)
+        per_row, fixed = BUDGETS[name]
+        budget = per_row * args.rows + fixed
+        over = peak > budget
+        failed |= over
+        print(f"{name:>30} {peak / 1024:>10.1f} {budget / 1024:>12.1f}{'  OVER BUDGET' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Check that both HTTP fetch paths give parse_table the same statistics.
+
+The fixture server is started once serving only the table markup and once
+serving only the __NEXT_DATA__ payload. Every page is fetched with
+http_fetch.fetch_table_html, which reads the markup directly in the first
+case and renders the payload into a table in the second. Both results go
+through update_table.parse_table and are compared with each other and with
+the rows the fixture generated. Runs offline against 127.0.0.1 and exits
+with status 1 on any difference.
+
+    python benchmarks/check_fetch_paths.py
+    python benchmarks/check_fetch_paths.py --rows 300
+"""
+import os
+import sys
+import argparse
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUMNS = ['Character', 'RP Gain', 'Pick Rate', 'Win Rate', 'TOP 3', 'Average Rank', 'Damage', 'Average TK',
+           'Player Kills', 'Animal Kills', 'Win Rate / Top 3']
+
+
+def expected_table(url, n_rows):
+    # What the fixture put on the page, in parse_table's columns
+    from fixture_server import synthetic_rows, page_seed
+    query = parse_qs(urlparse(url).query)
+    rows = synthetic_rows(n_rows, page_seed(query['tier'][0], query['period'][0]))
+    return pd.DataFrame([[row['name'], row['rpGain'], row['pickRate'], row['winRate'], row['top3Rate'], row['avgRank'],
+                          row['avgDamage'], row['avgTeamKill'], row['avgPlayerKill'], row['avgMonsterKill'],
+                          100 * (row['winRate'] / row['top3Rate'])] for row in rows], columns=COLUMNS)
+
+
+def fetch_parsed(mode, n_rows):
+    """``{key: (url, DataFrame or None)}`` for every page of a fixture server in ``mode``."""
+    from fixture_server import start_fixture_server, fixture_url_mapping
+    from http_fetch import fetch_table_html
+    from update_table import parse_table
+    server = start_fixture_server(mode=mode, n_rows=n_rows)
+    try:
+        tables = {}
+        for key, url in fixture_url_mapping(server).items():
+            table_html = fetch_table_html(url)
+            tables[key] = url, parse_table(table_html) if table_html else None
+        return tables
+    finally:
+        server.shutdown()
+
+
+def difference(left, right):
+    try:
+        pd.testing.assert_frame_equal(left, right, check_dtype=False)
+    except AssertionError as e:
+        return str(e).strip().splitlines()[0]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100)
+    args = parser.parse_args()
+
+    markup = fetch_parsed('table', args.rows)
+    embedded = fetch_parsed('embedded', args.rows)
+
+    failed = False
+    print(f"{'key':>34} {'markup':>8} {'embedded':>9}  result")
+    for key, (url, from_markup) in markup.items():
+        from_embedded = embedded[key][1]
+        if from_markup is None or from_embedded is None:
+            problem = 'no table found'
+        else:
+            expected = expected_table(url, args.rows)
+            problem = (difference(from_markup, from_embedded) or difference(from_markup, expected)
+                       or difference(from_embedded, expected))
+        failed |= problem is not None
+        rows = [len(table) if table is not None else '-' for table in (from_markup, from_embedded)]
+        print(f"{str(key):>34} {rows[0]:>8} {rows[1]:>9}  {problem or 'ok'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Bytes exchanged per click in the user defined group editor, by roster size.
+
+Replays a select and a deselect of one character box against the app with
+the Flask test client, with the Reference roster padded to each size, and
+prints the request and response sizes. They should not grow with the roster.
+
+    python benchmarks/editor_payload.py
+    python benchmarks/editor_payload.py --sizes 72 1000 10000
+"""
+import os
+import sys
+import json
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def click_request(index, style):
+    box = {'type': 'char-box', 'index': index}
+    return {
+        'output': '{"index":["MATCH"],"type":"char-box"}.style',
+        'outputs': {'id': box, 'property': 'style'},
+        'inputs': [{'id': box, 'property': 'n_clicks', 'value': 1}],
+        'changedPropIds': [json.dumps(box, separators=(',', ':'), sort_keys=True) + '.n_clicks'],
+        'state': [{'id': box, 'property': 'style', 'value': style}],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[72, 720, 7200])
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        import run
+    from config import default_roles_mapping
+    from styles import default_character_style, selected_character_style
+    client = run.server.test_client()
+    reference = default_roles_mapping['Reference']
+    original = list(reference)
+
+    print(f"{'roster':>7} {'action':>9} {'request (B)':>12} {'response (B)':>13}")
+    try:
+        for size in args.sizes:
+            # The callbacks read the roster at call time, so padding it in place is enough
+            reference[:] = (original + [f"캐릭터{i}" for i in range(len(original), size)])[:size]
+            index = size - 1  # the last box, the worst case for anything that scans the roster
+            for action, style in [('select', default_character_style), ('deselect', selected_character_style)]:
+                body = json.dumps(click_request(index, style), ensure_ascii=False).encode('utf-8')
+                response = client.post('/_dash-update-component', data=body, content_type='application/json')
+                assert response.status_code == 200, response.status_code
+                print(f"{size:>7} {action:>9} {len(body):>12} {len(response.data):>13}")
+    finally:
+        reference[:] = original
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Startup cost of the web app: import time per module, RSS, and what got loaded.
+
+Each entry module is imported in a fresh interpreter under ``-X importtime``.
+The report lists the slowest imports (cumulative and by top-level package),
+the total import time and the process RSS afterwards. It fails (exit status
+1) if the import loaded any of the scraping-only modules, or went over
+``--max-seconds`` / ``--max-rss-mb`` when those are given, so it can run in CI.
+
+    python benchmarks/import_report.py
+    python benchmarks/import_report.py --modules run wsgi --max-seconds 3 --max-rss-mb 250
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only the ingest side (update_table, ingest_daemon.py) may load these
+SCRAPING_MODULES = ['selenium', 'webdriver_manager', 'bs4', 'scraper', 'update_table', 'http_fetch']
+
+PROBE = """
+import sys, json, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+rss_kb = 0
+with open('/proc/self/status') as status:
+    for line in status:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+if not rss_kb:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{'elapsed': elapsed, 'rss_kb': rss_kb, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def probe(module):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE.format(module=module)],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return json.loads(result.stdout.splitlines()[-1]), timings
+
+
+def report(module, top):
+    summary, timings = probe(module)
+    print(f"== import {module}: {summary['elapsed']:.2f}s, RSS {summary['rss_kb'] / 1024:.0f} MB, "
+          f"{len(summary['modules'])} modules")
+
+    print(f"{'cumulative (ms)':>16} {'self (ms)':>10}  module")
+    for name, self_us, cumulative_us in sorted(timings, key=lambda timing: -timing[2])[:top]:
+        print(f"{cumulative_us / 1000:>16.1f} {self_us / 1000:>10.1f}  {name}")
+
+    by_package = {}
+    for name, self_us, _ in timings:
+        package = name.split('.')[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    print(f"{'self total (ms)':>16}  package")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{self_us / 1000:>16.1f}  {package}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', nargs='+', default=['run', 'wsgi'])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--max-seconds', type=float, help='fail if an import takes longer')
+    parser.add_argument('--max-rss-mb', type=float, help='fail if RSS after an import is larger')
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        summary = report(module, args.top)
+        loaded = [name for name in summary['modules'] if name.split('.')[0] in SCRAPING_MODULES]
+        if loaded:
+            failures.append(f"import {module} loaded scraping modules: {', '.join(loaded)}")
+        if args.max_seconds is not None and summary['elapsed'] > args.max_seconds:
+            failures.append(f"import {module} took {summary['elapsed']:.2f}s (limit {args.max_seconds}s)")
+        if args.max_rss_mb is not None and summary['rss_kb'] / 1024 > args.max_rss_mb:
+            failures.append(f"import {module} left RSS at {summary['rss_kb'] / 1024:.0f} MB (limit {args.max_rss_mb} MB)")
+        print()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"ok: {', '.join(args.modules)} import without {', '.join(SCRAPING_MODULES)}")
+
+
+if __name__ == '__main__':
+    main()
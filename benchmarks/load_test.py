@@ -0,0 +1,166 @@
+"""Measure request throughput of the gunicorn deployment as workers are added.
+
+A snapshot store of synthetic tables is written to a temporary directory,
+then for each worker count gunicorn is started on it (gunicorn.conf.py,
+no ingest daemon) and hammered for a fixed time by client processes
+fetching figure-data and replaying the slider callback over every tier,
+version and comparison. Throughput should grow with workers up to the
+number of cores.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --workers 1 2 4 8 --clients 16 --duration 20
+    python benchmarks/load_test.py --url http://127.0.0.1:8050   # an already running server
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import itertools
+import subprocess
+import contextlib
+import multiprocessing
+import tempfile
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TIERS = ['in_1000', 'diamond_plus', 'platinum_plus']
+VERSIONS = ['prevPatch', 'currentPatch', '3day', '7day']
+COMPARISONS = ['pick_vs_win', 'pick_vs_rp', 'top3_vs_winrate', 'tk_vs_top3', 'rp_vs_win']
+
+
+def figure_data_request(tier, version, comparison):
+    return 'GET', f"/figure-data?tier={tier}&version={version}&comparison={comparison}", None
+
+
+def slider_request(tier, version, view='single'):
+    properties = ['min', 'max', 'value', 'marks']
+    return 'POST', '/_dash-update-component', {
+        'output': '..' + '...'.join(f'pick-rate-slider.{name}' for name in properties) + '..',
+        'outputs': [{'id': 'pick-rate-slider', 'property': name} for name in properties],
+        'inputs': [{'id': 'version-dropdown', 'property': 'value', 'value': version},
+                   {'id': 'tier-dropdown', 'property': 'value', 'value': tier},
+                   {'id': 'view-dropdown', 'property': 'value', 'value': view}],
+        'changedPropIds': ['tier-dropdown.value'],
+        'state': [],
+    }
+
+
+def request_mix():
+    # What a page load and a few dropdown changes send
+    mix = [figure_data_request(*view) for view in itertools.product(TIERS, VERSIONS, COMPARISONS)]
+    mix += [slider_request(*view) for view in itertools.product(TIERS, VERSIONS)]
+    return mix
+
+
+def client(args):
+    url, duration, offset = args
+    session = requests.Session()
+    mix = request_mix()
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    for i in itertools.count(offset):
+        start = time.perf_counter()
+        if start >= deadline:
+            break
+        method, path, body = mix[i % len(mix)]
+        response = session.request(method, f"{url}{path}", json=body)
+        if response.status_code != 200:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def drive(url, clients, duration):
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.map(client, [(url, duration, i * 7) for i in range(clients)])
+    latencies = np.concatenate([np.array(latencies) for latencies, _ in results])
+    return len(latencies) / duration, np.percentile(latencies, [50, 95]), sum(errors for _, errors in results)
+
+
+def prepare_store(directory, n_rows):
+    from config import url_mapping
+    from fixture_server import synthetic_rows, render_table
+    import update_table
+    os.makedirs(os.path.join(directory, 'data'))
+    os.makedirs(os.path.join(directory, 'logs'))
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            update_table.ingest_tables({key: render_table(synthetic_rows(n_rows, seed)) for seed, key in enumerate(url_mapping)})
+            update_table.update_last_time()
+    finally:
+        os.chdir(cwd)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def gunicorn(directory, workers, threads):
+    port = free_port()
+    env = dict(os.environ, ER_PLOT_WORKERS=str(workers), ER_PLOT_THREADS=str(threads),
+               ER_PLOT_BIND=f"127.0.0.1:{port}", ER_PLOT_START_INGEST='0')
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+                                '--pythonpath', ROOT, 'wsgi:application'],
+                               cwd=directory, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                # Workers start before their snapshot is loaded; /ready answers 503 until it is
+                if requests.get(f"{url}/ready", timeout=1).ok:
+                    break
+            except requests.ConnectionError:
+                pass
+            if process.poll() is not None or time.time() > deadline:
+                raise RuntimeError(f"gunicorn with {workers} workers did not start")
+            time.sleep(0.5)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    cores = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, cores} & set(range(1, cores + 1))))
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=2 * cores, help='concurrent client processes')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load per worker count')
+    parser.add_argument('--rows', type=int, default=300, help='rows per synthetic table')
+    parser.add_argument('--url', help='load an already running server instead of starting gunicorn')
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'req/s':>9} {'speedup':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'errors':>7}")
+    if args.url:
+        drive(args.url, args.clients, 1.0)  # warm the figure cache
+        rate, (p50, p95), errors = drive(args.url, args.clients, args.duration)
+        print(f"{'-':>8} {rate:>9.1f} {'-':>8} {p50 * 1000:>9.1f} {p95 * 1000:>9.1f} {errors:>7}")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        prepare_store(directory, args.rows)
+        baseline = None
+        for workers in args.workers:
+            with gunicorn(directory, workers, args.threads) as url:
+                drive(url, args.clients, 1.0)  # warm every worker's figure cache
+                rate, (p50, p95), errors = drive(url, args.clients, args.duration)
+            baseline = baseline or rate
+            print(f"{workers:>8} {rate:>9.1f} {rate / baseline:>7.2f}x {p50 * 1000:>9.1f} {p95 * 1000:>9.1f} {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Response compression for the Flask server behind the Dash app.
+
+Text responses at least ``COMPRESS_MIN_BYTES`` long are compressed with
+brotli when the client accepts it and the ``brotli`` package is installed,
+with gzip otherwise. Responses that are versioned (an ETag, or a fingerprinted
+static bundle cached for a year) come out the same every time, so their
+compressed bodies are kept in a small LRU instead of being compressed again
+for every client. Streamed responses are compressed chunk by chunk.
+"""
+import gzip
+import zlib
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+from config import COMPRESS_MIN_BYTES, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY, COMPRESS_CACHE_SIZE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def choose_encoding(accept_encodings):
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        compress_chunk, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip framing
+        compress_chunk, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = compress_chunk(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def _cache_key(response, encoding):
+    etag, _ = response.get_etag()
+    if etag is None and (response.cache_control.max_age or 0) < 86400:
+        return None
+    return (request.full_path, etag, encoding)
+
+
+def compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(COMPRESSIBLE_TYPES)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is not None and response.is_streamed:
+        # Length unknown up front: compress as the chunks go out
+        response.response = compress_stream(response.response, encoding)
+        response.headers['Content-Encoding'] = encoding
+        response.headers.pop('Content-Length', None)
+        return response
+    if encoding is None or (response.content_length or 0) < COMPRESS_MIN_BYTES:
+        return response
+
+    key = _cache_key(response, encoding) if request.method == 'GET' else None
+    with _cache_lock:
+        body = _cache.get(key) if key else None
+        if body is not None:
+            _cache.move_to_end(key)
+    if body is None:
+        body = compress(response.get_data(), encoding)
+        if key:
+            with _cache_lock:
+                _cache[key] = body
+                while len(_cache) > COMPRESS_CACHE_SIZE:
+                    _cache.popitem(last=False)
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(server):
+    server.after_request(compress_response)
@@ -156,9 +156,124 @@ role_translation['Assassin'] = '암살자'
 role_translation['Supporter'] = '서포터'
 role_translation['User Defined'] = '유저 정의'
 
+tier_translation = {}
+tier_translation['in_1000'] = 'in 1000'
+tier_translation['diamond_plus'] = '다이아몬드+'
+tier_translation['platinum_plus'] = '플레티넘+'
+
+version_translation = {}
+version_translation['prevPatch'] = '이전 버전'
+version_translation['currentPatch'] = '현재 버전'
+version_translation['3day'] = '현재 버전 (최근 3일)'
+version_translation['7day'] = '현재 버전 (최근 7일)'
+
 # Define some style settings
 GLOBAL_FONT_FAMILY = "Helvetica Neue, Helvetica, Arial, sans-serif"
 PRIMARY_COLOR = "#007BFF"
 SECONDARY_COLOR = "#6c757d"
 BACKGROUND_COLOR = "#f8f9fa"
 TEXT_COLOR = "#212529"
+
+# Scraper settings
+SCRAPER_POOL_SIZE = 4  # Number of headless browsers kept alive
+SCRAPER_MAX_PAGES_PER_DRIVER = 24  # Recycle a browser after this many page loads
+SCRAPER_PAGE_TIMEOUT = 100  # Seconds to wait for the statistics table
+
+# Fetch settings
+FETCH_BACKEND = 'http'  # 'http' tries plain HTTP first and falls back to Selenium, 'selenium' always renders
+HTTP_FETCH_TIMEOUT = 20  # Seconds per request
+HTTP_FETCH_WORKERS = 6
+HTTP_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+# Field names of a character row in the page's embedded __NEXT_DATA__ payload, in table column order
+EMBEDDED_STATS_FIELDS = [
+    ('Character', 'name'),
+    ('RP Gain', 'rpGain'),
+    ('Pick Rate', 'pickRate'),
+    ('Win Rate', 'winRate'),
+    ('TOP 3', 'top3Rate'),
+    ('Average Rank', 'avgRank'),
+    ('Damage', 'avgDamage'),
+    ('Average TK', 'avgTeamKill'),
+    ('Player Kills', 'avgPlayerKill'),
+    ('Animal Kills', 'avgMonsterKill'),
+]
+
+# Keep the fetched table markup in data/ as a raw archive next to the snapshot store
+KEEP_RAW_HTML = True
+
+# Refresh schedule per url_mapping key: interval by (tier, period), priority by tier (lower runs first).
+# The most viewed tier and the short windows move fastest; prevPatch is frozen after the patch.
+# 60 scrapes a day in total, against 96 for every key each 3 hours.
+REFRESH_INTERVALS = {
+    ('in_1000', '3day'): 2 * 3600,           # 12/day
+    ('in_1000', 'currentPatch'): 3 * 3600,   # 8/day
+    ('in_1000', '7day'): 4 * 3600,           # 6/day
+    ('in_1000', 'prevPatch'): 24 * 3600,     # 1/day
+    ('diamond_plus', '3day'): 3 * 3600,      # 8/day
+    ('diamond_plus', 'currentPatch'): 4 * 3600,
+    ('diamond_plus', '7day'): 6 * 3600,
+    ('diamond_plus', 'prevPatch'): 24 * 3600,
+    ('platinum_plus', '3day'): 4 * 3600,     # 6/day
+    ('platinum_plus', 'currentPatch'): 6 * 3600,
+    ('platinum_plus', '7day'): 8 * 3600,
+    ('platinum_plus', 'prevPatch'): 24 * 3600,
+}
+REFRESH_PRIORITIES = {
+    'in_1000': 0,
+    'diamond_plus': 1,
+    'platinum_plus': 2,
+}
+REFRESH_JITTER = 0.1  # +/- fraction of the interval
+REFRESH_BACKOFF_BASE = 60  # Seconds before the first retry of a failed key
+REFRESH_BACKOFF_MAX = 3600
+REFRESH_BATCH_WINDOW = 120  # Keys due within this many seconds are fetched in one batch
+
+# Where the refresh scheduler runs: 'thread' inside the web process, or 'daemon' in
+# ingest_daemon.py, with web processes only reloading the snapshot store when it changes
+INGEST_MODE = 'thread'
+# Written by ingest_daemon.py: its schedule after every batch, and one file per key to refresh
+# now dropped by ``ingest_daemon.py --refresh``
+INGEST_STATUS_PATH = 'data/ingest_status.json'
+INGEST_REQUEST_DIR = 'data/ingest_requests'
+# Processes that record metrics for another's /metrics (the ingest daemon) write them here
+METRICS_SHARED_DIR = 'logs/metrics'
+METRICS_DUMP_INTERVAL = 10  # Seconds between dumps of each gunicorn worker's counters and sessions
+# gunicorn.conf.py restarts an ingest daemon that exited, waiting longer after each quick exit
+INGEST_RESTART_DELAY = 5
+INGEST_RESTART_DELAY_MAX = 300
+SNAPSHOT_POLL_INTERVAL = 5  # Seconds between checks of the store's generation file
+# Until a snapshot is loaded pages show a "data loading" notice and data requests get a 503;
+# both tell the browser to try again after this many seconds
+LOADING_RETRY_AFTER = 3
+
+# Figure cache
+FIGURE_CACHE_SIZE = 256  # Serialized figures kept per process
+PICK_RATE_SLIDER_STEP = 0.02
+
+# Send each (tier, version, comparison) table to the browser once and apply the
+# pick-rate slider and role highlight there (assets/clientside.js)
+CLIENTSIDE_FILTERING = True
+
+# Response compression: brotli when installed and accepted, gzip otherwise
+COMPRESS_MIN_BYTES = 1024  # Smaller responses are sent as they are
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 5
+COMPRESS_CACHE_SIZE = 64  # Compressed bodies of versioned responses (ETag or fingerprinted bundle)
+
+# Bulk data API (data_api.py): rows serialized per chunk of a streamed response
+DATA_API_CHUNK_ROWS = 1000
+
+# Draw with WebGL (scattergl) instead of SVG once a figure has more points than this
+SCATTERGL_THRESHOLD = 1000
+
+# Sessions
+SESSION_TIMEOUT = 300  # Seconds without a callback before a session counts as gone
+SESSION_BUCKET_SECONDS = 10  # Expiry granularity
+SESSION_REPORT_INTERVAL = 300
+SESSION_LOG_PATH = 'logs/session_log.jsonl'  # One JSON line of counts per report
+SESSION_LOG_MAX_BYTES = 1024 * 1024
+SESSION_LOG_BACKUPS = 5
+# Gunicorn workers share their active sessions as a HyperLogLog sketch of 2**precision one-byte
+# registers (4 KB, about 1.6% error), whatever the number of sessions
+SESSION_SKETCH_PRECISION = 12
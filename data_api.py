@@ -0,0 +1,218 @@
+"""Read-only bulk access to the statistics tables over HTTP.
+
+    GET /api/v1/datasets                          index: generation, datasets, rows, columns
+    GET /api/v1/datasets/<tier>/<version>         one table
+    GET /api/v1/datasets/all                      every table, with tier and version columns
+
+Tables come as JSON (default), CSV or an Arrow IPC stream, picked with
+``?format=json|csv|arrow`` or the Accept header, and ``?columns=Character,Pick Rate``
+keeps only the named columns. Bodies are streamed a few rows at a time from
+the snapshot held at the start of the request, so a download never sees two
+generations and is never built in memory whole. The ETag is made of the
+generation, the dataset, the format and the columns; a client that sends it
+back gets a 304 until the data changes.
+"""
+import json
+import hashlib
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from flask import Blueprint, Response, request, url_for
+
+from config import DATA_API_CHUNK_ROWS, LOADING_RETRY_AFTER
+from live_data import readiness
+from metrics import timed_callback
+from snapshot import get_snapshot
+
+FORMATS = {
+    'json': 'application/json',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+blueprint = Blueprint('data_api', __name__, url_prefix='/api/v1')
+
+
+class DataApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+@blueprint.errorhandler(DataApiError)
+def error_response(error):
+    body = {'error': str(error)}
+    response = Response(status=error.status, mimetype='application/json')
+    if error.status == 503:
+        body.update(readiness())
+        response.headers['Retry-After'] = str(LOADING_RETRY_AFTER)
+    response.set_data(json.dumps(body, ensure_ascii=False))
+    return response
+
+
+def current_snapshot():
+    # Held for the whole request, streaming included
+    snapshot = get_snapshot()
+    if not snapshot.ready:
+        raise DataApiError(503, 'Data is loading')
+    return snapshot
+
+
+def requested_format():
+    name = request.args.get('format')
+    if name is None:
+        # An explicit ?format= wins; otherwise the best Accept match, JSON when there is none
+        mimetype = request.accept_mimetypes.best_match(list(FORMATS.values()), default=FORMATS['json'])
+        return next(name for name, value in FORMATS.items() if value == mimetype)
+    if name not in FORMATS:
+        raise DataApiError(400, f"Unknown format {name!r}; use one of {', '.join(FORMATS)}")
+    return name
+
+
+def requested_columns(available):
+    # ?columns=a,b and ?columns=a&columns=b both work; column names contain spaces but no commas
+    names = [name.strip() for value in request.args.getlist('columns') for name in value.split(',') if name.strip()]
+    if not names:
+        return list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise DataApiError(400, f"Unknown columns {unknown}; available: {list(available)}")
+    return list(dict.fromkeys(names))
+
+
+def make_etag(snapshot, dataset, format_name, columns, all_columns):
+    projection = 'all' if columns == list(all_columns) else \
+        hashlib.sha1('\n'.join(columns).encode('utf-8')).hexdigest()[:12]
+    return f"{snapshot.generation}-{dataset}-{format_name}-{projection}"
+
+
+def conditional_response(etag, format_name, body):
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body(), mimetype=FORMATS[format_name])
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def split(df):
+    # Always at least one chunk, so an empty table still has a schema and a header
+    for start in range(0, max(len(df), 1), DATA_API_CHUNK_ROWS):
+        yield df.iloc[start:start + DATA_API_CHUNK_ROWS]
+
+
+def stream_json(chunks, columns, header):
+    """``{..header, "columns": [...], "rows": [{...}, ...]}``, written a chunk of rows at a time."""
+    yield json.dumps({**header, 'columns': columns}, ensure_ascii=False)[:-1] + ', "rows": ['
+    first = True
+    for chunk in chunks:
+        records = chunk.to_json(orient='records', force_ascii=False, double_precision=15)[1:-1]
+        if not records:
+            continue
+        yield records if first else ',' + records
+        first = False
+    yield ']}'
+
+
+def stream_csv(chunks, columns):
+    yield pd.DataFrame(columns=columns).to_csv(index=False)
+    for chunk in chunks:
+        yield chunk.to_csv(header=False, index=False)
+
+
+class _Sink:
+    # File-like target for the Arrow writer that hands back what was written since the last drain
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def stream_arrow(chunks):
+    sink = _Sink()
+    writer = None
+    for chunk in chunks:
+        if writer is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            writer = ipc.new_stream(sink, schema)
+        writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def stream(format_name, chunks, columns, header):
+    if format_name == 'json':
+        return stream_json(chunks, columns, header)
+    if format_name == 'csv':
+        return stream_csv(chunks, columns)
+    return stream_arrow(chunks)
+
+
+@blueprint.route('/datasets')
+@timed_callback
+def list_datasets():
+    snapshot = current_snapshot()
+    datasets = [{
+        'tier': tier,
+        'version': version,
+        'rows': len(df),
+        'columns': list(df.columns),
+        'url': url_for('data_api.get_dataset', tier=tier, version=version),
+    } for (tier, version), df in snapshot.tables.items()]
+    payload = {'generation': snapshot.generation, 'last_update_time': readiness()['last_update_time'],
+               'formats': list(FORMATS), 'datasets': datasets}
+    return conditional_response(f"{snapshot.generation}-index", 'json',
+                                lambda: json.dumps(payload, ensure_ascii=False))
+
+
+@blueprint.route('/datasets/<tier>/<version>')
+@timed_callback
+def get_dataset(tier, version):
+    snapshot = current_snapshot()
+    df = snapshot.tables.get((tier, version))
+    if df is None:
+        raise DataApiError(404, f"No dataset {tier}/{version}")
+    format_name = requested_format()
+    columns = requested_columns(df.columns)
+    etag = make_etag(snapshot, f"{tier}.{version}", format_name, columns, df.columns)
+    # Projected a chunk at a time, so no whole-table copy is made either
+    chunks = (chunk[columns] for chunk in split(df))
+    header = {'generation': snapshot.generation, 'tier': tier, 'version': version}
+    return conditional_response(etag, format_name, lambda: stream(format_name, chunks, columns, header))
+
+
+@blueprint.route('/datasets/all')
+@timed_callback
+def get_all_datasets():
+    snapshot = current_snapshot()
+    if not snapshot.tables:
+        raise DataApiError(404, 'No datasets')
+    format_name = requested_format()
+    # Every table has the same columns; tier and version tell the rows apart
+    all_columns = ['tier', 'version'] + list(next(iter(snapshot.tables.values())).columns)
+    columns = requested_columns(all_columns)
+    etag = make_etag(snapshot, 'all', format_name, columns, all_columns)
+
+    chunks = (chunk.assign(tier=tier, version=version)[columns]
+              for (tier, version), df in snapshot.tables.items() for chunk in split(df))
+    header = {'generation': snapshot.generation}
+    return conditional_response(etag, format_name, lambda: stream(format_name, chunks, columns, header))
+
+
+def init_data_api(server):
+    server.register_blueprint(blueprint)
@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ScrapeResult:
+    __slots__ = ('html', 'elapsed', 'error', 'backend')
+
+    def __init__(self, html, elapsed, error=None, backend=None):
+        self.html = html
+        self.elapsed = elapsed
+        self.error = error
+        self.backend = backend
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def fetch_all(url_mapping, fetch, max_workers, backend=None):
+    """Run ``fetch(url)`` for every entry on ``max_workers`` threads; returns ``{key: ScrapeResult}``."""
+    def run(key, url):
+        start = time.perf_counter()
+        try:
+            html = fetch(url)
+            error = None if html else 'Table not found'
+        except Exception as e:
+            html, error = None, e
+        return key, ScrapeResult(html, time.perf_counter() - start, error, backend)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(url_mapping)))) as executor:
+        futures = [executor.submit(run, key, url) for key, url in url_mapping.items()]
+        return dict(future.result() for future in futures)
+
+
+def report_scrape_times(results):
+    from metrics import scrape_duration, scrape_failures
+    for key, result in results.items():
+        tier, period = key
+        scrape_duration.observe(result.elapsed, tier=tier, period=period, backend=result.backend)
+        if not result.ok:
+            scrape_failures.inc(tier=tier, period=period)
+        status = 'ok' if result.ok else f'failed ({result.error})'
+        print(f"[scrape] {key}: {result.elapsed:.2f}s via {result.backend} {status}")
+    total = sum(result.elapsed for result in results.values())
+    print(f"[scrape] {len(results)} pages, {total:.2f}s of page time")
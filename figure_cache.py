@@ -0,0 +1,66 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from config import FIGURE_CACHE_SIZE, PICK_RATE_SLIDER_STEP
+from snapshot import add_publish_listener
+
+
+def quantize_range(selected_range, step=PICK_RATE_SLIDER_STEP):
+    # Snap the slider range to its step so near-identical drags share one entry
+    return tuple(round(round(value / step) * step, 6) for value in selected_range)
+
+
+def group_hash(characters):
+    if not characters:
+        return None
+    return hashlib.sha1('\n'.join(sorted(characters)).encode('utf-8')).hexdigest()[:16]
+
+
+class FigureCache:
+    """Bounded LRU of serialized figure JSON keyed by data generation and view inputs."""
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_json(self, key):
+        """The serialized entry, for responses that can be sent as they are."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return payload
+
+    def get(self, key):
+        payload = self.get_json(key)
+        return None if payload is None else json.loads(payload)
+
+    def put(self, key, payload):
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, *_):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+figure_cache = FigureCache()
+# Entries of older generations can never be hit again
+add_publish_listener(figure_cache.clear)
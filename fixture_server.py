@@ -0,0 +1,210 @@
+"""Local stand-in for the dak.gg statistics page.
+
+Serves synthetic statistics for every ``url_mapping`` key so both fetch
+backends can be exercised and benchmarked without network access::
+
+    python fixture_server.py --port 8765 --mode both
+    python fixture_server.py --bench
+"""
+import zlib
+import gzip
+import html
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from config import url_mapping, default_roles_mapping
+
+# 'table': server-rendered markup, 'embedded': __NEXT_DATA__ only (table is drawn by JS),
+# 'both': markup and payload, 'js_only': nothing the HTTP backend can read
+FIXTURE_MODES = ('table', 'embedded', 'both', 'js_only')
+
+# The page's columns after the rank: header, field of a __NEXT_DATA__ character row, cell format.
+# Written out here rather than taken from config or http_fetch, so the fixture is a second
+# description of the page that the parsers can be checked against, not a copy of them.
+PAGE_COLUMNS = [
+    ('실험체', 'name', '{}'),
+    ('RP 획득', 'rpGain', '+{}'),
+    ('픽률', 'pickRate', '{}%'),
+    ('승률', 'winRate', '{}%'),
+    ('TOP 3', 'top3Rate', '{}%'),
+    ('평균 순위', 'avgRank', '#{}'),
+    ('평균 딜량', 'avgDamage', '{:,}'),
+    ('평균 TK', 'avgTeamKill', '{}'),
+    ('킬', 'avgPlayerKill', '{}'),
+    ('동물 킬', 'avgMonsterKill', '{}'),
+]
+
+
+def synthetic_characters(n_rows):
+    names = []
+    for role, characters in default_roles_mapping.items():
+        if role not in ('Reference', 'User Defined'):
+            names.extend(name for name in characters if name not in names)
+    names.extend(f"무기{i} 캐릭터{i}" for i in range(len(names), n_rows))
+    return names[:n_rows]
+
+
+def synthetic_rows(n_rows, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for name in synthetic_characters(n_rows):
+        top_3 = round(rng.uniform(20, 45), 1)
+        rows.append({
+            'name': name,
+            'rpGain': round(rng.uniform(0.5, 20), 1),
+            'pickRate': round(rng.uniform(0.05, 4), 2),
+            'winRate': round(rng.uniform(0.3, 0.5) * top_3, 1),
+            'top3Rate': top_3,
+            'avgRank': round(rng.uniform(3, 5), 1),
+            'avgDamage': rng.randint(8000, 20000),
+            'avgTeamKill': round(rng.uniform(3, 8), 2),
+            'avgPlayerKill': round(rng.uniform(1, 3), 2),
+            'avgMonsterKill': round(rng.uniform(20, 60), 1),
+        })
+    return rows
+
+
+def page_seed(tier, period, revision=0):
+    # Seed of the rows served for one page, from the URL's query parameters
+    return zlib.crc32(f"{tier}/{period}/{revision}".encode())
+
+
+def render_table(rows):
+    """The statistics table as the page serves it: a header row, then nested markup in the cells."""
+    header = '<tr><th>#</th>' + ''.join(f'<th>{title}</th>' for title, _, _ in PAGE_COLUMNS) + '</tr>'
+    body = []
+    for rank, row in enumerate(rows, start=1):
+        name = html.escape(row['name'])
+        cells = [f'<td><span class="rank">{rank}</span></td>',
+                 f'<td><a href="/er/characters/{rank}"><img alt="{name}" src="/img/{rank}.png"><span>{name}</span></a></td>']
+        cells.extend(f'<td><div><span>{html.escape(form.format(row[field]))}</span></div></td>'
+                     for _, field, form in PAGE_COLUMNS[1:])
+        body.append('<tr>' + ''.join(cells) + '</tr>')
+    return (f'<table class="w-full text-[12px]"><thead>{header}</thead>'
+            f'<tbody>{"".join(body)}</tbody></table>')
+
+
+def render_page(rows, mode='both'):
+    table = render_table(rows) if mode in ('table', 'both') else ''
+    payload = ''
+    if mode in ('embedded', 'both'):
+        data = {'props': {'pageProps': {'statistics': {'characters': rows}}}}
+        payload = f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data, ensure_ascii=False)}</script>'
+    # Draw the table client-side when the markup is not served, like the real page does
+    fields = json.dumps([field for _, field, _ in PAGE_COLUMNS])
+    script = f"""<script>
+window.addEventListener('load', function () {{
+  if (document.querySelector('table') || !document.getElementById('__NEXT_DATA__')) return;
+  var rows = JSON.parse(document.getElementById('__NEXT_DATA__').textContent).props.pageProps.statistics.characters;
+  var fields = {fields};
+  var table = document.createElement('table');
+  table.className = 'w-full text-[12px]';
+  rows.forEach(function (row, i) {{
+    var tr = table.insertRow();
+    tr.insertCell().textContent = '#' + (i + 1);
+    fields.forEach(function (field) {{ tr.insertCell().textContent = row[field]; }});
+  }});
+  document.body.appendChild(table);
+}});
+</script>"""
+    return f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>{payload}<main>{table}</main>{script}</body></html>'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if parsed.path != '/er/statistics' or 'tier' not in query or 'period' not in query:
+            self.send_error(404)
+            return
+
+        server = self.server
+        seed = page_seed(query['tier'][0], query['period'][0], server.revision)
+        body = render_page(synthetic_rows(server.n_rows, seed), server.mode).encode('utf-8')
+        if server.delay:
+            time.sleep(server.delay)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        server.requests += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(port=0, mode='both', n_rows=100, delay=0.0):
+    """Start the stand-in server on a daemon thread; ``server.revision += 1`` changes every table."""
+    if mode not in FIXTURE_MODES:
+        raise ValueError(f"mode must be one of {FIXTURE_MODES}")
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    server.daemon_threads = True
+    server.mode = mode
+    server.n_rows = n_rows
+    server.delay = delay
+    server.revision = 0
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fixture_url_mapping(server):
+    # Same keys as config.url_mapping, pointed at the local server
+    host, port = server.server_address[:2]
+    mapping = {}
+    for key, url in url_mapping.items():
+        mapping[key] = f"http://{host}:{port}/er/statistics?{urlparse(url).query}"
+    return mapping
+
+
+def benchmark(mode='both', n_rows=100, delay=0.0, selenium=False):
+    import http_fetch
+    server = start_fixture_server(mode=mode, n_rows=n_rows, delay=delay)
+    mapping = fixture_url_mapping(server)
+    try:
+        backends = [('http', http_fetch.fetch_all_tables)]
+        if selenium:
+            from scraper import get_driver_pool
+            backends.append(('selenium', get_driver_pool().scrape_all))
+        for name, fetch in backends:
+            start = time.perf_counter()
+            results = fetch(mapping)
+            elapsed = time.perf_counter() - start
+            ok = sum(result.ok for result in results.values())
+            print(f"[{name}] {ok}/{len(results)} tables in {elapsed:.3f}s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--mode', choices=FIXTURE_MODES, default='both')
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--delay', type=float, default=0.0, help='Artificial per-page latency in seconds')
+    parser.add_argument('--bench', action='store_true', help='Time the fetch backends against a private server')
+    parser.add_argument('--selenium', action='store_true', help='Include the Selenium backend in --bench')
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.mode, args.rows, args.delay, args.selenium)
+    else:
+        server = start_fixture_server(args.port, args.mode, args.rows, args.delay)
+        print(f"[fixture] Serving {args.mode} pages on http://127.0.0.1:{args.port}/er/statistics")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
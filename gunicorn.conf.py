@@ -0,0 +1,63 @@
+"""gunicorn settings for wsgi.py, configured through the environment.
+
+    ER_PLOT_WORKERS        worker processes (default: one per core)
+    ER_PLOT_THREADS        request threads per worker (default: 4)
+    ER_PLOT_BIND           listen address (default: 0.0.0.0:443 with TLS, 0.0.0.0:8050 without)
+    ER_PLOT_CERTFILE       TLS certificate chain, ER_PLOT_KEYFILE its key; TLS is off when unset
+    ER_PLOT_START_INGEST   0 to not start ingest_daemon.py, e.g. when it runs under its own service
+"""
+import os
+import sys
+import signal
+import itertools
+import subprocess
+import multiprocessing
+
+workers = int(os.environ.get('ER_PLOT_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('ER_PLOT_THREADS', 4))
+worker_class = 'gthread'
+
+certfile = os.environ.get('ER_PLOT_CERTFILE') or None
+keyfile = os.environ.get('ER_PLOT_KEYFILE') or None
+bind = [os.environ.get('ER_PLOT_BIND', '0.0.0.0:443' if certfile else '0.0.0.0:8050')]
+
+# Import the app once in the master; workers share its pages copy-on-write
+preload_app = True
+timeout = 60
+graceful_timeout = 30
+
+_ingest = None
+
+
+def on_starting(server):
+    global _ingest
+    if os.environ.get('ER_PLOT_START_INGEST', '1') != '0':
+        # --supervise restarts the daemon whenever it exits, until it is sent SIGTERM
+        daemon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ingest_daemon.py')
+        _ingest = subprocess.Popen([sys.executable, daemon_path, '--supervise'])
+        server.log.info(f"Started ingest daemon supervisor (pid {_ingest.pid})")
+
+
+def when_ready(server):
+    import wsgi
+    wsgi.load_snapshot()
+
+
+def pre_fork(server, worker):
+    # Runs in the master: a replacement worker takes the slot its predecessor left free
+    used = {getattr(other, 'slot', None) for other in server.WORKERS.values()}
+    worker.slot = next(slot for slot in itertools.count() if slot not in used)
+
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.start_worker_threads(worker.slot)
+
+
+def on_exit(server):
+    if _ingest is not None and _ingest.poll() is None:
+        _ingest.send_signal(signal.SIGTERM)
+        try:
+            _ingest.wait(graceful_timeout)
+        except subprocess.TimeoutExpired:
+            _ingest.kill()
@@ -0,0 +1,220 @@
+"""Append-only time-series store of every ingested statistics table.
+
+Rows are kept per UTC day under ``data/history/YYYY-MM-DD/``:
+
+- ``rows.bin``: fixed-width records ``(timestamp, key, character, metrics...)``
+- ``index.bin``: one ``(timestamp, key, start, count)`` record per appended table
+
+Both files are only ever appended to and are read through ``numpy.memmap``,
+so queries touch the pages of the days they need and never the full history.
+The index record is written after its rows, which makes it the commit point:
+a torn write (rows past the last index entry, or a partial index record) is
+cut off by the next append. Only tables whose
+content changed are appended; the state at time T is the latest table at or
+before T.
+"""
+import os
+import json
+import time
+import threading
+import datetime
+
+import numpy as np
+import pandas as pd
+
+HISTORY_DIR = os.path.join('data', 'history')
+DICTIONARY_NAME = 'dictionary.json'
+
+METRIC_COLUMNS = ['RP Gain', 'Pick Rate', 'Win Rate', 'TOP 3', 'Average Rank', 'Damage',
+                  'Average TK', 'Player Kills', 'Animal Kills', 'Win Rate / Top 3']
+ROW_DTYPE = np.dtype([('timestamp', '<i8'), ('key', '<i2'), ('character', '<i4')] +
+                     [(column, '<f8') for column in METRIC_COLUMNS])
+INDEX_DTYPE = np.dtype([('timestamp', '<i8'), ('key', '<i2'), ('start', '<i8'), ('count', '<i4')])
+
+
+def _day(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime('%Y-%m-%d')
+
+
+def _memmap(path, dtype):
+    # np.memmap refuses empty files
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size < dtype.itemsize:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(size // dtype.itemsize,))
+
+
+class HistoryStore:
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._dictionary = None
+
+    # Dictionary of key / character ids, append-only so ids never move
+    def _load_dictionary(self):
+        path = os.path.join(self.root, DICTIONARY_NAME)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        # Reload when another process (the ingest daemon) has added names
+        if self._dictionary is None or self._dictionary['mtime'] != mtime:
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    dictionary = json.load(file)
+            except FileNotFoundError:
+                dictionary = {'keys': [], 'characters': []}
+            dictionary['mtime'] = mtime
+            dictionary['key_ids'] = {tuple(key): i for i, key in enumerate(dictionary['keys'])}
+            dictionary['character_ids'] = {name: i for i, name in enumerate(dictionary['characters'])}
+            self._dictionary = dictionary
+        return self._dictionary
+
+    def _save_dictionary(self):
+        dictionary = self._dictionary
+        path = os.path.join(self.root, DICTIONARY_NAME)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as file:
+            json.dump({'keys': dictionary['keys'], 'characters': dictionary['characters']}, file, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+        dictionary['mtime'] = os.path.getmtime(path)
+
+    def _key_id(self, key, create=False):
+        dictionary = self._load_dictionary()
+        key = tuple(key)
+        if key not in dictionary['key_ids'] and create:
+            dictionary['key_ids'][key] = len(dictionary['keys'])
+            dictionary['keys'].append(list(key))
+        return dictionary['key_ids'].get(key)
+
+    def _character_id(self, name, create=False):
+        dictionary = self._load_dictionary()
+        if name not in dictionary['character_ids'] and create:
+            dictionary['character_ids'][name] = len(dictionary['characters'])
+            dictionary['characters'].append(name)
+        return dictionary['character_ids'].get(name)
+
+    def _partitions(self, start=None, end=None):
+        if not os.path.isdir(self.root):
+            return []
+        days = sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+        if start is not None:
+            days = [day for day in days if day >= _day(start)]
+        if end is not None:
+            days = [day for day in days if day <= _day(end)]
+        return days
+
+    def append(self, tables, timestamp=None):
+        """Append ``{(tier, period): DataFrame}`` observed at ``timestamp`` (epoch seconds)."""
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        partition = os.path.join(self.root, _day(timestamp))
+        with self._lock:
+            os.makedirs(partition, exist_ok=True)
+            rows_path = os.path.join(partition, 'rows.bin')
+            index_path = os.path.join(partition, 'index.bin')
+
+            # Drop what a crashed writer left behind the last committed index entry: a partial
+            # index record, which would misalign every later one, and rows no record points to
+            committed = _memmap(index_path, INDEX_DTYPE)
+            n_committed = len(committed)
+            start = int(committed['start'][-1] + committed['count'][-1]) if n_committed else 0
+            del committed
+            if os.path.exists(index_path) and os.path.getsize(index_path) != n_committed * INDEX_DTYPE.itemsize:
+                os.truncate(index_path, n_committed * INDEX_DTYPE.itemsize)
+            if os.path.exists(rows_path) and os.path.getsize(rows_path) != start * ROW_DTYPE.itemsize:
+                os.truncate(rows_path, start * ROW_DTYPE.itemsize)
+
+            records, index = [], []
+            for key, df in tables.items():
+                key_id = self._key_id(key, create=True)
+                rows = np.zeros(len(df), dtype=ROW_DTYPE)
+                rows['timestamp'] = timestamp
+                rows['key'] = key_id
+                rows['character'] = [self._character_id(name, create=True) for name in df['Character']]
+                for column in METRIC_COLUMNS:
+                    rows[column] = df[column].to_numpy(dtype='f8')
+                records.append(rows)
+                index.append((timestamp, key_id, start, len(rows)))
+                start += len(rows)
+            self._save_dictionary()
+
+            with open(rows_path, 'ab') as file:
+                for rows in records:
+                    file.write(rows.tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+            # The commit point: durable only once the index records are on disk
+            with open(index_path, 'ab') as file:
+                file.write(np.array(index, dtype=INDEX_DTYPE).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _read_partition(self, day):
+        partition = os.path.join(self.root, day)
+        return _memmap(os.path.join(partition, 'index.bin'), INDEX_DTYPE), _memmap(os.path.join(partition, 'rows.bin'), ROW_DTYPE)
+
+    def trajectory(self, tier, period, character, metrics=None, start=None, end=None):
+        """Return one character's metrics over time as a DataFrame indexed by UTC timestamp."""
+        metrics = metrics or METRIC_COLUMNS
+        with self._lock:
+            key_id = self._key_id((tier, period))
+            character_id = self._character_id(character)
+        if key_id is None or character_id is None:
+            return pd.DataFrame(columns=metrics, index=pd.DatetimeIndex([], tz='UTC', name='timestamp'))
+
+        chunks = []
+        for day in self._partitions(start, end):
+            index, rows = self._read_partition(day)
+            entries = index[index['key'] == key_id]
+            if start is not None:
+                entries = entries[entries['timestamp'] >= start]
+            if end is not None:
+                entries = entries[entries['timestamp'] <= end]
+            for entry in entries:
+                block = rows[entry['start']:entry['start'] + entry['count']]
+                chunks.append(np.asarray(block[block['character'] == character_id]))
+
+        found = np.concatenate(chunks) if chunks else np.empty(0, dtype=ROW_DTYPE)
+        timestamps = pd.to_datetime(found['timestamp'], unit='s', utc=True)
+        return pd.DataFrame({metric: found[metric] for metric in metrics},
+                            index=pd.DatetimeIndex(timestamps, name='timestamp'))
+
+    def roster_at(self, tier, period, when=None):
+        """Return the whole table for ``(tier, period)`` as it was at ``when`` (epoch seconds, default now)."""
+        when = int(when if when is not None else time.time())
+        with self._lock:
+            key_id = self._key_id((tier, period))
+            names = list(self._load_dictionary()['characters'])
+        if key_id is None:
+            return None
+
+        # Walk back day by day until a table for this key shows up
+        for day in reversed(self._partitions(end=when)):
+            index, rows = self._read_partition(day)
+            entries = index[(index['key'] == key_id) & (index['timestamp'] <= when)]
+            if len(entries) == 0:
+                continue
+            entry = entries[np.argmax(entries['timestamp'])]
+            block = np.asarray(rows[entry['start']:entry['start'] + entry['count']])
+            df = pd.DataFrame({column: block[column] for column in METRIC_COLUMNS})
+            df.insert(0, 'Character', [names[i] for i in block['character']])
+            df.attrs['timestamp'] = int(entry['timestamp'])
+            return df
+        return None
+
+    def timestamps(self, tier, period, start=None, end=None):
+        with self._lock:
+            key_id = self._key_id((tier, period))
+        if key_id is None:
+            return []
+        found = []
+        for day in self._partitions(start, end):
+            index, _ = self._read_partition(day)
+            found.extend(int(ts) for ts in index['timestamp'][index['key'] == key_id])
+        return [ts for ts in found if (start is None or ts >= start) and (end is None or ts <= end)]
+
+
+_history_store = None
+
+
+def get_history_store():
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore()
+    return _history_store
@@ -0,0 +1,95 @@
+import re
+import json
+import html
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetching import fetch_all
+from config import HTTP_FETCH_TIMEOUT, HTTP_FETCH_WORKERS, HTTP_USER_AGENT, EMBEDDED_STATS_FIELDS
+
+# dak.gg 통계 테이블은 중첩 테이블이 없으므로 정규식으로 바로 잘라낸다
+TABLE_PATTERN = re.compile(r'<table[^>]*class="w-full text-\[12px\]"[^>]*>.*?</table>', re.S)
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+PERCENT_COLUMNS = {'Pick Rate', 'Win Rate', 'TOP 3'}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # Keep-alive connection pool shared by every fetch thread
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_FETCH_WORKERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update({
+                'User-Agent': HTTP_USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml',
+                'Accept-Encoding': 'gzip, deflate',
+                'Accept-Language': 'ko',
+            })
+            _session = session
+        return _session
+
+
+def extract_table_markup(page):
+    match = TABLE_PATTERN.search(page)
+    return match.group(0) if match else None
+
+
+def _find_stat_rows(node, names):
+    # Depth-first search for the first list of dicts carrying every stats field
+    if isinstance(node, list):
+        if node and all(isinstance(item, dict) and names.issubset(item) for item in node):
+            return node
+        children = node
+    elif isinstance(node, dict):
+        children = node.values()
+    else:
+        return None
+    for child in children:
+        rows = _find_stat_rows(child, names)
+        if rows is not None:
+            return rows
+    return None
+
+
+def render_table(rows):
+    """Render stats rows in the column layout ``update_table.parse_html`` reads."""
+    body = []
+    for rank, row in enumerate(rows, start=1):
+        cells = [f"#{rank}"]
+        for column, field in EMBEDDED_STATS_FIELDS:
+            value = row[field]
+            if column == 'Damage':
+                value = f"{int(value):,}"
+            elif column in PERCENT_COLUMNS:
+                value = f"{value}%"
+            cells.append(html.escape(str(value)))
+        body.append('<tr>' + ''.join(f'<td>{cell}</td>' for cell in cells) + '</tr>')
+    return '<table class="w-full text-[12px]"><tbody>' + ''.join(body) + '</tbody></table>'
+
+
+def extract_embedded_table(page):
+    match = NEXT_DATA_PATTERN.search(page)
+    if not match:
+        return None
+    rows = _find_stat_rows(json.loads(match.group(1)), {field for _, field in EMBEDDED_STATS_FIELDS})
+    return render_table(rows) if rows else None
+
+
+def fetch_table_html(url, timeout=HTTP_FETCH_TIMEOUT):
+    response = get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    page = response.text
+    return extract_table_markup(page) or extract_embedded_table(page)
+
+
+def fetch_all_tables(url_mapping):
+    return fetch_all(url_mapping, fetch_table_html, HTTP_FETCH_WORKERS, backend='http')
@@ -0,0 +1,211 @@
+"""Run the fetch, parse and store pipeline as its own process.
+
+The daemon owns the refresh scheduler and is the only writer of the snapshot
+store (data/snapshot). Every refresh that changes a table commits a new
+manifest and generation file with write-then-rename, and web processes
+started with ``INGEST_MODE = 'daemon'`` pick the new generation up through
+``live_data.watch_snapshot_store`` without restarting. Only this process
+ever loads Selenium or starts a browser.
+
+The running daemon writes its schedule (next run, last success, failures
+per key) to ``INGEST_STATUS_PATH`` after every batch, and picks up keys
+dropped into ``INGEST_REQUEST_DIR`` by ``--refresh`` to fetch them at once.
+
+    python ingest_daemon.py          # refresh every key on its schedule until stopped
+    python ingest_daemon.py --once   # refresh every key now, then exit
+    python ingest_daemon.py --supervise                   # the daemon, restarted whenever it exits
+    python ingest_daemon.py --status                      # schedule of the running daemon
+    python ingest_daemon.py --refresh in_1000/3day        # ask the running daemon to refresh now
+    python ingest_daemon.py --refresh all
+"""
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+import subprocess
+
+from config import url_mapping, INGEST_STATUS_PATH, INGEST_REQUEST_DIR, SNAPSHOT_POLL_INTERVAL
+
+
+def key_name(key):
+    return '/'.join(key)
+
+
+def parse_keys(names):
+    if names == ['all']:
+        return list(url_mapping)
+    keys = [tuple(name.split('/', 1)) for name in names]
+    unknown = [name for name, key in zip(names, keys) if key not in url_mapping]
+    if unknown:
+        sys.exit(f"Unknown keys {unknown}; use tier/period, e.g. {key_name(next(iter(url_mapping)))}, or all")
+    return keys
+
+
+def write_status(scheduler):
+    status = {'written_at': time.time(), 'pid': os.getpid(),
+              'keys': [{**state, 'key': key_name(state['key'])} for state in scheduler.state()]}
+    tmp_path = f"{INGEST_STATUS_PATH}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(status, file, indent=1)
+    os.replace(tmp_path, INGEST_STATUS_PATH)
+
+
+def read_status():
+    try:
+        with open(INGEST_STATUS_PATH, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def last_successes():
+    """``{key: last success}`` recorded by the previous daemon, so a restart keeps each key's schedule."""
+    try:
+        status = read_status()
+    except (OSError, ValueError) as e:
+        print(f"[ingest] ignoring unreadable {INGEST_STATUS_PATH}: {e}")
+        return {}
+    if status is None:
+        return {}
+    return {tuple(state['key'].split('/', 1)): state['last_success']
+            for state in status['keys'] if state.get('last_success') is not None}
+
+
+def print_status():
+    status = read_status()
+    if status is None:
+        sys.exit(f"No {INGEST_STATUS_PATH}: the daemon has not run here yet")
+
+    def when(timestamp):
+        return '-' if timestamp is None else time.strftime('%m/%d %H:%M:%S', time.localtime(timestamp))
+
+    print(f"daemon pid {status['pid']}, status written {when(status['written_at'])}")
+    print(f"{'key':>26} {'interval':>9} {'next run':>15} {'last success':>15} {'failures':>9} {'runs':>5}")
+    for state in status['keys']:
+        print(f"{state['key']:>26} {state['interval'] / 3600:>8.0f}h {when(state['next_run']):>15} "
+              f"{when(state['last_success']):>15} {state['failures']:>9} {state['runs']:>5}")
+
+
+def request_refresh(keys):
+    # One empty file per key; the running daemon removes it when it schedules the key
+    os.makedirs(INGEST_REQUEST_DIR, exist_ok=True)
+    for key in keys:
+        open(os.path.join(INGEST_REQUEST_DIR, '__'.join(key)), 'w').close()
+    print(f"Requested a refresh of {', '.join(key_name(key) for key in keys)}")
+
+
+def watch_refresh_requests(scheduler, stop):
+    while not stop.wait(SNAPSHOT_POLL_INTERVAL):
+        try:
+            names = os.listdir(INGEST_REQUEST_DIR)
+        except FileNotFoundError:
+            continue
+        for name in names:
+            key = tuple(name.split('__', 1))
+            os.remove(os.path.join(INGEST_REQUEST_DIR, name))
+            if key in url_mapping:
+                print(f"[ingest] refresh of {key_name(key)} requested")
+                scheduler.refresh_now(key)
+
+
+def supervise():
+    """Run the daemon as a child process and start it again whenever it exits, until SIGTERM or SIGINT."""
+    from config import INGEST_RESTART_DELAY, INGEST_RESTART_DELAY_MAX
+    stopping = threading.Event()
+    child = [None]
+
+    def stop(signum, frame):
+        stopping.set()
+        if child[0] is not None and child[0].poll() is None:
+            child[0].send_signal(signal.SIGTERM)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    delay = INGEST_RESTART_DELAY
+    while not stopping.is_set():
+        started = time.time()
+        child[0] = subprocess.Popen([sys.executable, os.path.abspath(__file__)])
+        code = child[0].wait()
+        if stopping.is_set():
+            break
+        # A daemon that ran for a while gets restarted quickly; one that keeps dying, less and less often
+        delay = INGEST_RESTART_DELAY if time.time() - started > INGEST_RESTART_DELAY_MAX \
+            else min(INGEST_RESTART_DELAY_MAX, delay * 2)
+        print(f"[ingest] daemon exited with status {code}, restarting in {delay}s")
+        stopping.wait(delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--once', action='store_true', help='refresh every key once and exit')
+    parser.add_argument('--status', action='store_true', help="print the running daemon's schedule and exit")
+    parser.add_argument('--supervise', action='store_true', help='run the daemon and restart it whenever it exits')
+    parser.add_argument('--refresh', nargs='+', metavar='KEY',
+                        help='ask the running daemon to refresh tier/period keys (or all) now, and exit')
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return
+    if args.supervise:
+        supervise()
+        return
+    if args.refresh:
+        request_refresh(parse_keys(args.refresh))
+        return
+
+    # The scraping side is only loaded by the commands that scrape
+    from update_table import update_database, refresh_keys, missing_keys
+    from scheduler import get_scheduler
+    import metrics
+    # Scrape and parse timings are shown by the web processes' /metrics
+    metrics.share_as('ingest')
+
+    # Seeds the store from data/*.html on a fresh install, so web workers have something to serve
+    update_database()
+
+    if args.once:
+        outcome = refresh_keys(list(url_mapping))
+        failed = [key for key, ok in outcome.items() if not ok]
+        print(f"[ingest] refreshed {len(outcome) - len(failed)} keys, failed: {failed or 'none'}")
+        metrics.dump()
+        return
+
+    scheduler = get_scheduler(last_success=last_successes())
+    missing = missing_keys()
+    if missing:
+        # Nothing stored for these (fresh install, unusable or partial store): fetch them now
+        # rather than one refresh interval later, while web workers answer "loading"
+        print(f"[ingest] no stored table for {', '.join(key_name(key) for key in missing)}, refreshing now")
+        for key in missing:
+            scheduler.refresh_now(key)
+
+    def after_batch(scheduler):
+        write_status(scheduler)
+        metrics.dump()
+    scheduler.on_batch = after_batch
+    write_status(scheduler)
+    stopped = threading.Event()
+    threading.Thread(target=watch_refresh_requests, args=(scheduler, stopped), daemon=True).start()
+
+    def stop(signum, frame):
+        print(f"[ingest] signal {signum}, stopping after the current batch")
+        stopped.set()
+        scheduler.stop()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print("[ingest] Run...")
+    try:
+        scheduler.run()
+    finally:
+        # Browsers are only started lazily, so there is nothing to close if none were needed
+        if 'scraper' in sys.modules:
+            sys.modules['scraper'].get_driver_pool().shutdown()
+
+
+if __name__ == '__main__':
+    main()
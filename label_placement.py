@@ -0,0 +1,135 @@
+"""Greedy text label placement for the scatter plots.
+
+Coordinates are normalised to the unit square, which is covered by a uniform
+occupancy grid of ``GRID_RESOLUTION`` x ``GRID_RESOLUTION`` cells. Every
+marker occupies its cell, and every label gets a box sized from its own text
+at each of the candidate positions around its point. Labels are placed one
+by one, in the given order so callers can put important points first, at
+the first candidate whose cells are all free (or the least crowded one when
+none is), and the chosen box is then marked as occupied.
+
+Each grid row is a bitset held in a Python int. All labels are one line
+high, so next to the rows the grid keeps bands: ``bands[r]`` is the OR of
+the ``height`` rows starting at ``r``, and testing whether a candidate box is
+free is a single shift and AND whatever the number of placed labels. When
+no candidate is free, the rows around the point are packed into one int and
+each candidate's occupied cells are counted with one AND and popcount.
+Candidate boxes for all points are computed up front with NumPy, and the
+whole pass is O(n) in the number of points regardless of how they cluster.
+"""
+from operator import itemgetter
+
+import numpy as np
+
+# Plotly textposition and the direction the label box is shifted from its point
+CANDIDATE_POSITIONS = [
+    ('top center', 0, 1),
+    ('bottom center', 0, -1),
+    ('middle right', 1, 0),
+    ('middle left', -1, 0),
+    ('top right', 1, 1),
+    ('top left', -1, 1),
+    ('bottom right', 1, -1),
+    ('bottom left', -1, -1),
+]
+
+# Box starts along an axis are computed for these directions; each candidate picks its pair
+_DIRECTIONS = np.array([-1, 0, 1], dtype=np.int32)
+_candidate_columns = itemgetter(*[dx + 1 for _, dx, _ in CANDIDATE_POSITIONS])
+_candidate_rows = itemgetter(*[dy + 1 for _, _, dy in CANDIDATE_POSITIONS])
+
+CHAR_WIDTH = 0.011  # Width of one character as a fraction of the axis span
+LINE_HEIGHT = 0.03  # Height of one line of text as a fraction of the axis span
+GRID_RESOLUTION = 256
+
+# int.bit_count is Python 3.10+
+_popcount = getattr(int, 'bit_count', None) or (lambda value: bin(value).count('1'))
+
+
+def _normalise(values):
+    values = np.asarray(values, dtype=float)
+    span = values.max() - values.min()
+    return (values - values.min()) / span if span > 0 else np.zeros_like(values)
+
+
+def _candidate_starts(cells, sizes, directions):
+    # First cell of each candidate box along one axis, shape (n, len(directions)).
+    # Boxes beside the point start next to its cell and centred boxes straddle it,
+    # so a label never covers its own marker.
+    return np.where(directions > 0, cells[:, None] + 1,
+                    np.where(directions < 0, cells[:, None] - sizes[:, None],
+                             cells[:, None] - sizes[:, None] // 2))
+
+
+def _least_crowded(rows, columns, first_rows, label_mask, height, repeats):
+    # The window covering every candidate is packed row after row into one int,
+    # ``stride`` bits a row; a box is then the label mask repeated once per row
+    left = min(columns)
+    bottom = min(first_rows)
+    stride = max(columns) - left + label_mask.bit_length()
+    window_mask = (1 << stride) - 1
+    packed = 0
+    for row in reversed(rows[bottom:max(first_rows) + height]):
+        packed = (packed << stride) | ((row >> left) & window_mask)
+    if stride not in repeats:
+        repeats[stride] = sum(1 << (k * stride) for k in range(height))
+    box = label_mask * repeats[stride]
+    crowding = [_popcount((packed >> (column - left + (first_row - bottom) * stride)) & box)
+                for column, first_row in zip(columns, first_rows)]
+    return crowding.index(min(crowding))
+
+
+def place_labels(x, y, texts, char_width=CHAR_WIDTH, line_height=LINE_HEIGHT, resolution=GRID_RESOLUTION):
+    """Return a plotly ``textposition`` for every point."""
+    n = len(texts)
+    if n == 0:
+        return []
+    cell_x = np.minimum((_normalise(x) * resolution).astype(np.int32), resolution - 1)
+    cell_y = np.minimum((_normalise(y) * resolution).astype(np.int32), resolution - 1)
+    widths = np.maximum(np.ceil(np.array([len(str(text)) for text in texts]) * char_width * resolution).astype(np.int32), 1)
+    height = max(int(np.ceil(line_height * resolution)), 1)
+
+    # Labels may stick out of the plot, so the grid gets a margin on every side
+    margin = max(int(widths.max()), height) + 1
+    cell_x += margin
+    cell_y += margin
+    # Each axis has three box starts per point, kept as (n, 3) int32 arrays and read a
+    # point at a time: as nested lists they would cost several times the table itself
+    column_start = _candidate_starts(cell_x, widths, _DIRECTIONS)
+    row_start = _candidate_starts(cell_y, np.full(n, height, dtype=np.int32), _DIRECTIONS)
+
+    rows = [0] * (resolution + 2 * margin)
+    for cx, cy in zip(cell_x.tolist(), cell_y.tolist()):
+        rows[cy] |= 1 << cx
+    bands = [0] * len(rows)
+    for cy, row in enumerate(rows):
+        if row:
+            for r in range(cy - height + 1, cy + 1):
+                bands[r] |= row
+
+    widths = widths.tolist()
+    chosen = []
+    candidates = range(len(CANDIDATE_POSITIONS))
+    repeats = {}
+    for i in range(n):
+        label_mask = (1 << widths[i]) - 1
+        columns = _candidate_columns(column_start[i].tolist())
+        first_rows = _candidate_rows(row_start[i].tolist())
+        best = None
+        for c in candidates:
+            if not (bands[first_rows[c]] >> columns[c]) & label_mask:
+                best = c
+                break
+        if best is None:
+            # Nothing is free: take the candidate covering the fewest occupied cells
+            best = _least_crowded(rows, columns, first_rows, label_mask, height, repeats)
+
+        mask = label_mask << columns[best]
+        first_row = first_rows[best]
+        for r in range(first_row, first_row + height):
+            rows[r] |= mask
+        # Every band that includes one of the box's rows
+        for r in range(max(first_row - height + 1, 0), first_row + height):
+            bands[r] |= mask
+        chosen.append(CANDIDATE_POSITIONS[best][0])
+    return chosen
@@ -0,0 +1,90 @@
+"""The serving side of the statistics data: what web processes need and nothing more.
+
+Reads the published snapshot, follows the snapshot store written by the
+ingest side (update_table / ingest_daemon.py) and keeps the last update time.
+Nothing here imports the scraping stack, so a web process never loads
+BeautifulSoup or Selenium.
+"""
+import threading
+
+from snapshot import publish, get_snapshot
+
+LAST_UPDATE_PATH = 'data/last_update_time.txt'
+
+# 문자열 참조 교체는 원자적이므로 읽기에 락이 필요 없다
+last_update_time = None
+# Manifest of the snapshot store as last published in this process
+loaded_manifest = None
+# Generation whose figure caches have been built in the background (run.warm_figure_cache)
+warmed_generation = 0
+
+
+def reload_snapshot_store():
+    """Publish the tables another process committed to the snapshot store since the last load.
+
+    Only tables whose fingerprint changed are read. Returns True if a new
+    snapshot was published.
+    """
+    from snapshot_store import read_generation, load_tables
+    global loaded_manifest
+    # Any other generation is news, a lower one too: the store may have been deleted and rebuilt
+    if loaded_manifest is not None and read_generation() == loaded_manifest['generation']:
+        return False
+    tables, manifest = load_tables(loaded=loaded_manifest)
+    if manifest is None:
+        return False
+    loaded_manifest = manifest
+    if not tables:
+        return False
+    publish(tables, manifest['generation'])
+    return True
+
+
+def watch_snapshot_store(stop=None):
+    """Reload the snapshot store whenever the ingest daemon commits a new generation, until ``stop`` is set."""
+    from config import SNAPSHOT_POLL_INTERVAL
+    stop = stop or threading.Event()
+    while True:
+        try:
+            if reload_snapshot_store():
+                print(f"[reload] snapshot generation {get_snapshot().generation}")
+            # The daemon stamps the update time after committing, so read it on every poll
+            load_last_update_time()
+        except Exception as e:
+            print(f"Error reloading snapshot store: {e}")
+        if stop.wait(SNAPSHOT_POLL_INTERVAL):
+            return
+
+
+def load_last_update_time():
+    global last_update_time
+    try:
+        with open(LAST_UPDATE_PATH, 'r', encoding='utf-8') as f:
+            last_update_time = f.read().strip() or last_update_time
+    except FileNotFoundError:
+        pass
+
+
+def get_last_update_time():
+    return last_update_time
+
+
+def readiness():
+    """'loading' until a snapshot is published, 'warming' while its caches are built, then 'ready'.
+
+    A stale snapshot counts as ready: it is served while newer data is fetched.
+    """
+    snapshot = get_snapshot()
+    if not snapshot.ready:
+        status = 'loading'
+    elif warmed_generation < snapshot.generation:
+        status = 'warming'
+    else:
+        status = 'ready'
+    return {'status': status, 'generation': snapshot.generation, 'warmed_generation': warmed_generation,
+            'last_update_time': last_update_time}
+
+
+def get_database():
+    # Lock-free: the snapshot reference is swapped atomically and never mutated
+    return get_snapshot().tables
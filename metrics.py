@@ -0,0 +1,266 @@
+"""In-process metrics in the Prometheus text format, served at /metrics by run.py.
+
+Counters and histograms are sharded per thread: each thread only ever
+updates its own shard, so the hot path is a couple of dict lookups and
+integer adds with no lock and no I/O. Shards are summed when /metrics is
+scraped. Gauges are callables evaluated at scrape time.
+
+Processes of one deployment (gunicorn workers, ingest_daemon.py) call
+``share_as`` with a name of their own and then ``dump`` now and then: their
+counters and histograms are written to a file in ``METRICS_SHARED_DIR``, and
+``render`` adds the files of every other live process to its own samples, so
+whichever worker answers a scrape reports the totals of all of them.
+"""
+import os
+import json
+import glob
+import time
+import bisect
+import threading
+import functools
+
+from config import METRICS_SHARED_DIR, METRICS_DUMP_INTERVAL
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PIPELINE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+REGISTRY = []
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Sharded:
+    """Base of metrics whose samples live in per-thread shards."""
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()  # taken once per thread, on its first sample
+        REGISTRY.append(self)
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _labels(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def merged(self, others):
+        """This process's totals plus the same metric's totals in the ``others`` dumps."""
+        totals = self.totals()
+        for other in others:
+            for key, value in other.get(self.name, ()):
+                key = tuple(key)
+                totals[key] = self._add(totals[key], value) if key in totals else value
+        return totals
+
+    def _snapshot(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        # Copy each shard before reading; its thread may insert new label sets meanwhile
+        return [dict(shard) for shard in shards]
+
+
+class Counter(_Sharded):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = self._labels(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def totals(self):
+        totals = {}
+        for shard in self._snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    @staticmethod
+    def _add(total, value):
+        return total + value
+
+    def render(self, others=()):
+        for key, value in sorted(self.merged(others).items()):
+            yield f"{self.name}_total{_label_text(self.labelnames, key)} {value}"
+
+
+class Histogram(_Sharded):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = self._labels(labels)
+        series = shard.get(key)
+        if series is None:
+            # [count per bucket..., +Inf count, sum]
+            series = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, **labels):
+        """Decorator observing the wall time of every call."""
+        def decorate(function):
+            @functools.wraps(function)
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, **labels)
+            return timed
+        return decorate
+
+    def totals(self):
+        totals = {}
+        for shard in self._snapshot():
+            for key, series in shard.items():
+                total = totals.setdefault(key, [0] * len(series))
+                for i, value in enumerate(list(series)):
+                    total[i] += value
+        return totals
+
+    @staticmethod
+    def _add(total, series):
+        return [a + b for a, b in zip(total, series)]
+
+    def render(self, others=()):
+        for key, series in sorted(self.merged(others).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', bound)])} {cumulative}"
+            yield f"{self.name}_sum{_label_text(self.labelnames, key)} {series[-1]}"
+            yield f"{self.name}_count{_label_text(self.labelnames, key)} {cumulative}"
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, function, labelnames=()):
+        """``function()`` returns a number, or ``{label values tuple: number}`` when there are labels."""
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def render(self, others=()):
+        # Gauges describe the process answering the scrape and are never shared
+        try:
+            value = self.function()
+        except Exception as e:
+            print(f"Error evaluating gauge {self.name}: {e}")
+            return
+        samples = value.items() if self.labelnames else [((), value)]
+        for key, sample in sorted(samples):
+            if sample is not None:
+                yield f"{self.name}{_label_text(self.labelnames, key)} {sample}"
+
+
+_process_name = None
+
+
+def share_as(name):
+    """Make ``dump`` write this process's counters and histograms under ``name``."""
+    global _process_name
+    _process_name = name
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def write_shared(kind, payload):
+    """Write ``payload`` as this process's ``kind`` file in the shared directory; no-op before ``share_as``."""
+    if _process_name is None:
+        return
+    os.makedirs(METRICS_SHARED_DIR, exist_ok=True)
+    path = os.path.join(METRICS_SHARED_DIR, f"{kind}.{_process_name}.json")
+    tmp_path = f"{path}.tmp.{threading.get_ident()}"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump({'pid': os.getpid(), 'written_at': time.time(), 'payload': payload}, file)
+    os.replace(tmp_path, path)
+
+
+def read_shared(kind):
+    """Payloads of the ``kind`` files of the other live processes."""
+    payloads = []
+    for path in glob.glob(os.path.join(METRICS_SHARED_DIR, f"{kind}.*.json")):
+        if _process_name is not None and path.endswith(f".{_process_name}.json"):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                shared = json.load(file)
+        except (OSError, ValueError):
+            continue
+        # A dead process's file is left behind until its successor overwrites it
+        if shared['pid'] != os.getpid() and _alive(shared['pid']):
+            payloads.append(shared['payload'])
+    return payloads
+
+
+def dump():
+    write_shared('metrics', {metric.name: [[list(key), value] for key, value in metric.totals().items()]
+                             for metric in REGISTRY if isinstance(metric, _Sharded)})
+
+
+def run_dumper(interval=METRICS_DUMP_INTERVAL, stop=None):
+    """Dump this process's metrics every ``interval`` seconds until ``stop`` is set; run in a daemon thread."""
+    stop = stop or threading.Event()
+    while True:
+        try:
+            dump()
+        except Exception as e:
+            print(f"Error dumping metrics: {e}")
+        if stop.wait(interval):
+            return
+
+
+def render():
+    # Dumped first, so a later scrape answered by another process never sees lower totals for this one
+    dump()
+    others = read_shared('metrics')
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render(others))
+    return '\n'.join(lines) + '\n'
+
+
+callback_latency = Histogram('er_plot_callback_latency_seconds', 'Dash callback latency.', ['callback'])
+scrape_duration = Histogram('er_plot_scrape_duration_seconds', 'Time to fetch one url_mapping page.',
+                            ['tier', 'period', 'backend'], PIPELINE_BUCKETS)
+scrape_failures = Counter('er_plot_scrape_failures', 'Pages that could not be fetched.', ['tier', 'period'])
+parse_duration = Histogram('er_plot_parse_duration_seconds', 'Time to parse one fetched table.',
+                           ['tier', 'period'], LATENCY_BUCKETS)
+
+
+def timed_callback(function):
+    """Observe a Dash callback's latency under its function name; goes beneath ``@app.callback``."""
+    return callback_latency.time(callback=function.__name__)(function)
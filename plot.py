@@ -1,275 +1,344 @@
-import plotly.express as px
-
-
-def adjust_text_position(df, x_col, y_col, text_col):
-    # The positions of the texts are initialized to the top center of the point
-    positions = ['top center' for _ in range(len(df))]
-
-    # Extracting coordinates for all points
-    points = df[[x_col, y_col]].values
-    # Estimating the width and height of text boxes
-    # This is a placeholder; actual implementation should calculate based on text size and length
-    text_box_width = max(df[text_col].apply(len)) * 0.02  # Width of the text box
-    text_box_height = 0.05  # Height of the text box (assuming single line of text)
-
-    # Define a function to create bounding boxes for each point
-    def get_bounding_boxes(points, text_box_width, text_box_height):
-        return [(x - text_box_width / 2, y - text_box_height / 2,
-                 x + text_box_width / 2, y + text_box_height / 2) for x, y in points]
-
-    bounding_boxes = get_bounding_boxes(points, text_box_width, text_box_height)
-
-    # Function to check if two boxes overlap
-    def boxes_overlap(box1, box2):
-        return not (box1[2] < box2[0] or box1[0] > box2[2] or
-                    box1[3] < box2[1] or box1[1] > box2[3])
-
-    # Check each pair of boxes for overlap and adjust positions
-    for i, box1 in enumerate(bounding_boxes):
-        for j, box2 in enumerate(bounding_boxes):
-            if i != j and boxes_overlap(box1, box2):
-                # If they overlap, adjust positions
-                if points[i][1] < points[j][1]:
-                    # If point i is lower than point j, move the text of point i to the bottom
-                    positions[i] = 'bottom center'
-                else:
-                    # If point i is higher than point j, move the text of point i to the top
-                    positions[i] = 'top center'
-
-    return positions
-
-
-def customize_plot(fig):
-    # Simplify gridlines
-    fig.update_xaxes(showgrid=True, gridwidth=0.5, gridcolor='WhiteSmoke')
-    fig.update_yaxes(showgrid=True, gridwidth=0.5, gridcolor='WhiteSmoke')
-
-    # Update layout for a cleaner look
-    fig.update_layout(
-        margin=dict(l=40, r=40, t=40, b=40),
-        paper_bgcolor='white',
-        plot_bgcolor='white'
-    )
-
-    fig.update_layout(legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1,
-        xanchor="left",
-        x=0.01,
-        bgcolor="GhostWhite",
-        bordercolor="LightSteelBlue",
-        borderwidth=1
-    ))
-
-    fig.update_layout(legend_title_text='')
-    fig.update_layout(dragmode='pan')
-    return fig
-
-
-def plot_top3_vs_winrate(filtered_df, df, role, role_translation):
-    sizes = 3 + (filtered_df['Pick Rate'] - df['Pick Rate'].min()) / (df['Pick Rate'].max() - df['Pick Rate'].min()) * 120
-
-    fig = px.scatter(filtered_df, x='TOP 3', y='Win Rate / Top 3', text='Character', size=sizes,
-                     color='역할군',  # Use the color column for point colors
-                     color_discrete_map={role_translation[role]: "Crimson", "전체": "LightSkyBlue"},
-                     custom_data=[filtered_df['Pick Rate']])
-
-    # Add the weighted average lines
-    weighted_avg_win_per_third = (df['Pick Rate'] * df['Win Rate / Top 3']).sum() / df['Pick Rate'].sum() if df['Pick Rate'].sum() != 0 else 0
-    weighted_avg_top_3 = (df['Pick Rate'] * df['TOP 3']).sum() / df['Pick Rate'].sum() if df['Pick Rate'].sum() != 0 else 0
-
-    fig.add_hline(y=weighted_avg_win_per_third, line_dash="dot",
-                    annotation_text=f"<b>3등 확보 시 평균 승률: {weighted_avg_win_per_third:.2f}%</b>",
-                    annotation_position="bottom right", line_color="orange",
-                    annotation_font={'size': 12, 'color': 'orange'})
-
-    fig.add_vline(x=weighted_avg_top_3, line_dash="dot",
-                    annotation_text=f"<b>평균 3등 확보 비율: {weighted_avg_top_3:.2f}%</b>",
-                    annotation_position="top right", line_color="green",
-                    annotation_font={'size': 12, 'color': 'green'})
-
-
-    # Set layout details
-    fig.update_layout(
-            xaxis_title='<b>Top 3 비율 (%)</b>',
-            yaxis_title='<b>Top 3 시 승률 (%)</b>',
-            plot_bgcolor='white',
-            hovermode='closest',
-        )
-
-    text_positions = adjust_text_position(df, 'TOP 3', 'Win Rate / Top 3', 'Character')
-    for trace, position in zip(fig.data, text_positions):
-        trace.update(textposition=position)
-
-    # Customize hover info for each trace (point)
-    fig.update_traces(
-        hovertemplate='<b>%{text}</b><br>Top 3 비율: %{x:.2f}%<br>Top 3 시 승률: %{y:.2f}%<br>픽률: %{customdata[0]:.2f}%<extra></extra>'
-    )
-
-    # Customize the appearance of the hover box
-    # fig.update_traces(hoverlabel=dict(bgcolor='RoyalBlue', font_size=14, font_family='Arial'))
-
-    return fig
-
-
-def plot_tk_vs_top3(filtered_df, df, role, role_translation):
-    sizes = 3 + (filtered_df['Pick Rate'] - df['Pick Rate'].min()) / (df['Pick Rate'].max() - df['Pick Rate'].min()) * 120
-
-    fig = px.scatter(filtered_df, x='Average TK', y='TOP 3', text='Character', size=sizes,
-                     color='역할군',  # Use the color column for point colors
-                     color_discrete_map={role_translation[role]: "Crimson", "전체": "LightSkyBlue"},
-                     custom_data=[filtered_df['Pick Rate']])
-
-    # Add the weighted average lines
-    weighted_avg_tk = (df['Pick Rate'] * df['Average TK']).sum() / df['Pick Rate'].sum() if df['Pick Rate'].sum() != 0 else 0
-    weighted_avg_top_3 = (df['Pick Rate'] * df['TOP 3']).sum() / df['Pick Rate'].sum() if df['Pick Rate'].sum() != 0 else 0
-
-    fig.add_vline(x=weighted_avg_tk, line_dash="dot",
-                    annotation_text=f"<b>평균 팀킬 수: {weighted_avg_tk:.2f}</b>",
-                    annotation_position="bottom right", line_color="orange",
-                    annotation_font={'size': 12, 'color': 'orange'})
-
-    fig.add_hline(y=weighted_avg_top_3, line_dash="dot",
-                    annotation_text=f"<b>평균 3등 확보 비율: {weighted_avg_top_3:.2f}%</b>",
-                    annotation_position="top right", line_color="green",
-                    annotation_font={'size': 12, 'color': 'green'})
-
-
-    # Set layout details
-    fig.update_layout(
-            xaxis_title='<b>평균 팀킬 수</b>',
-            yaxis_title='<b>평균 3등 확보 비율 (%)</b>',
-            plot_bgcolor='white',
-            hovermode='closest',
-        )
-
-    text_positions = adjust_text_position(df, 'Average TK', 'TOP 3', 'Character')
-    for trace, position in zip(fig.data, text_positions):
-        trace.update(textposition=position)
-
-    # Customize hover info for each trace (point)
-    fig.update_traces(
-        hovertemplate='<b>%{text}</b><br>평균 팀킬 수: %{x:.2f}%<br>평균 3등 확보 비율: %{y:.2f}%<br>픽률: %{customdata[0]:.2f}%<extra></extra>'
-    )
-
-    # Customize the appearance of the hover box
-    # fig.update_traces(hoverlabel=dict(bgcolor='RoyalBlue', font_size=14, font_family='Arial'))
-
-    return fig
-
-
-def pick_pick_vs_win(filtered_df, df, role, role_translation):
-    # Calculate the weighted average win rate
-    weighted_sum = (df['Pick Rate'] * df['Win Rate']).sum()
-    total_pick_rate = df['Pick Rate'].sum()
-    weighted_avg_win_rate = weighted_sum / total_pick_rate if total_pick_rate != 0 else 0
-
-    # Create the scatter plot
-    sizes = 3 + (filtered_df['Pick Rate'] - df['Pick Rate'].min()) / (df['Pick Rate'].max() - df['Pick Rate'].min()) * 120
-    fig = px.scatter(filtered_df, x='Pick Rate', y='Win Rate', text='Character', size=sizes,
-                     color='역할군',  # Use the color column for point colors
-                     color_discrete_map={role_translation[role]: "Crimson", "전체": "LightSkyBlue"},)
-
-    fig.add_hline(y=weighted_avg_win_rate, line_dash="dot",
-                    annotation_text=f"<b>전체 평균 승률: {weighted_avg_win_rate:.2f}%</b>",
-                    annotation_position="bottom right", line_color="orange",
-                    annotation_font={'size': 12, 'color': 'orange'})
-
-    # Customize hover info for each trace (point)
-    for trace in fig.data:
-        trace.hoverinfo = 'text'
-        trace.hovertemplate = '<b>%{text}</b><br>픽률: %{x:.2f}%<br>승률: %{y:.2f}%<extra></extra>'
-
-    # Customize layout for readability
-    fig.update_layout(
-        xaxis_title='<b>픽률 (%)</b>',
-        yaxis_title='<b>승률 (%)</b>',
-        plot_bgcolor='white',
-        hovermode='closest'
-    )
-
-    text_positions = adjust_text_position(filtered_df, 'Pick Rate', 'Win Rate', 'Character')
-    for trace, position in zip(fig.data, text_positions):
-        trace.update(textposition=position)
-    return fig
-
-
-def plot_pick_vs_rp(filtered_df, df, role, role_translation):
-    weighted_sum = (df['Pick Rate'] * df['RP Gain']).sum()
-    total_pick_rate = df['Pick Rate'].sum()
-    weighted_avg_rpgain = weighted_sum / total_pick_rate if total_pick_rate != 0 else 0
-
-    # Create the scatter plot
-    sizes = 3 + (filtered_df['Pick Rate'] - df['Pick Rate'].min()) / (df['Pick Rate'].max() - df['Pick Rate'].min()) * 120
-    fig = px.scatter(filtered_df, x='Pick Rate', y='RP Gain', text='Character', size=sizes,
-                     color='역할군',  # Use the color column for point colors
-                     color_discrete_map={role_translation[role]: "Crimson", "전체": "LightSkyBlue"},)
-
-    fig.add_hline(y=weighted_avg_rpgain, line_dash="dot",
-                    annotation_text=f"<b>전체 평균 RP 획득량: {weighted_avg_rpgain:.2f}</b>",
-                    annotation_position="bottom right", line_color="orange",
-                    annotation_font={'size': 12, 'color': 'orange'})
-
-    # Customize hover info for each trace (point)
-    for trace in fig.data:
-        trace.hoverinfo = 'text'
-        trace.hovertemplate = '<b>%{text}</b><br>픽률: %{x:.2f}%<br>RP 획득량: %{y:.2f}<extra></extra>'
-
-    # Customize layout for readability
-    fig.update_layout(
-        # title='픽률 vs RP 획득량',
-        xaxis_title='<b>픽률 (%)</b>',
-        yaxis_title='<b>RP 획득량</b>',
-        plot_bgcolor='white',
-        hovermode='closest'
-    )
-
-    text_positions = adjust_text_position(filtered_df, 'Pick Rate', 'RP Gain', 'Character')
-    for trace, position in zip(fig.data, text_positions):
-        trace.update(textposition=position)
-    return fig
-
-
-def plot_rp_vs_win(filtered_df, df, role, role_translation):
-    # Create the scatter plot
-    sizes = 3 + (filtered_df['Pick Rate'] - df['Pick Rate'].min()) / (df['Pick Rate'].max() - df['Pick Rate'].min()) * 120
-    fig = px.scatter(filtered_df, x='RP Gain', y='Win Rate', text='Character', size=sizes,
-                     color='역할군',  # Use the color column for point colors
-                     color_discrete_map={role_translation[role]: "Crimson", "전체": "LightSkyBlue"},
-                     custom_data=[filtered_df['Pick Rate']])
-
-    total_pick_rate = df['Pick Rate'].sum()
-
-    weighted_sum = (df['Pick Rate'] * df['RP Gain']).sum()
-    weighted_avg_rpgain = weighted_sum / total_pick_rate if total_pick_rate != 0 else 0
-    fig.add_vline(x=weighted_avg_rpgain, line_dash="dot",
-                  annotation_text=f"<b>전체 평균 RP 획득량: {weighted_avg_rpgain:.2f}</b>",
-                  annotation_position="bottom right", line_color="orange",
-                  annotation_font={'size': 12, 'color': 'orange'})
-
-    weighted_sum = (df['Pick Rate'] * df['Win Rate']).sum()
-    weighted_avg_rpgain = weighted_sum / total_pick_rate if total_pick_rate != 0 else 0
-    fig.add_hline(y=weighted_avg_rpgain, line_dash="dot",
-                  annotation_text=f"<b>전체 평균 승률: {weighted_avg_rpgain:.2f}</b>",
-                  annotation_position="bottom right", line_color="green",
-                  annotation_font={'size': 12, 'color': 'green'})
-
-
-    # Customize hover info for each trace (point)
-    fig.update_traces(
-        hovertemplate='<b>%{text}</b><br>RP 획득량: %{x:.2f}<br>승률: %{y:.2f}%<br>픽률: %{customdata[0]:.2f}%<extra></extra>'
-    )
-
-    # Customize layout for readability
-    fig.update_layout(
-        xaxis_title='<b>RP 획득량</b>',
-        yaxis_title='<b>승률 (%)</b>',
-        plot_bgcolor='white',
-        hovermode='closest'
-    )
-
-    text_positions = adjust_text_position(filtered_df, 'RP Gain', 'Win Rate', 'Character')
-    for trace, position in zip(fig.data, text_positions):
-        trace.update(textposition=position)
-    return fig
+"""Scatter figures for run.py, built directly as plotly figure dicts.
+
+Nothing goes through plotly.express or graph_objects: every comparison is a
+row of ``COMPARISONS`` (axes, hover text, weighted-average reference lines),
+points are read from the DataFrame as NumPy arrays and sent as typed arrays,
+and all figures share ``BASE_LAYOUT``, built once from plotly's default
+template. Past ``SCATTERGL_THRESHOLD`` points the traces switch to WebGL.
+``small_multiples_figure`` draws one comparison for many tables as a grid of
+panels with shared axes.
+"""
+import json
+import base64
+import pkgutil
+
+import numpy as np
+
+from config import SCATTERGL_THRESHOLD
+from label_placement import place_labels
+
+HIGHLIGHT_COLOR = 'Crimson'
+DEFAULT_COLOR = 'LightSkyBlue'
+WHOLE_NAME = '전체'
+MAX_MARKER_SIZE = 20  # px.scatter's default size_max
+
+# Each reference line: (axis, metric, annotation format, annotation position, colour)
+COMPARISONS = {
+    'top3_vs_winrate': {
+        'x': 'TOP 3', 'y': 'Win Rate / Top 3',
+        'x_title': '<b>Top 3 비율 (%)</b>', 'y_title': '<b>Top 3 시 승률 (%)</b>',
+        'hovertemplate': '<b>%{text}</b><br>Top 3 비율: %{x:.2f}%<br>Top 3 시 승률: %{y:.2f}%<br>픽률: %{customdata[0]:.2f}%<extra></extra>',
+        'pick_rate_customdata': True,
+        'lines': [('h', 'Win Rate / Top 3', '<b>3등 확보 시 평균 승률: {:.2f}%</b>', 'bottom right', 'orange'),
+                  ('v', 'TOP 3', '<b>평균 3등 확보 비율: {:.2f}%</b>', 'top right', 'green')],
+    },
+    'tk_vs_top3': {
+        'x': 'Average TK', 'y': 'TOP 3',
+        'x_title': '<b>평균 팀킬 수</b>', 'y_title': '<b>평균 3등 확보 비율 (%)</b>',
+        'hovertemplate': '<b>%{text}</b><br>평균 팀킬 수: %{x:.2f}%<br>평균 3등 확보 비율: %{y:.2f}%<br>픽률: %{customdata[0]:.2f}%<extra></extra>',
+        'pick_rate_customdata': True,
+        'lines': [('v', 'Average TK', '<b>평균 팀킬 수: {:.2f}</b>', 'bottom right', 'orange'),
+                  ('h', 'TOP 3', '<b>평균 3등 확보 비율: {:.2f}%</b>', 'top right', 'green')],
+    },
+    'pick_vs_win': {
+        'x': 'Pick Rate', 'y': 'Win Rate',
+        'x_title': '<b>픽률 (%)</b>', 'y_title': '<b>승률 (%)</b>',
+        'hovertemplate': '<b>%{text}</b><br>픽률: %{x:.2f}%<br>승률: %{y:.2f}%<extra></extra>',
+        'pick_rate_customdata': False,
+        'lines': [('h', 'Win Rate', '<b>전체 평균 승률: {:.2f}%</b>', 'bottom right', 'orange')],
+    },
+    'pick_vs_rp': {
+        'x': 'Pick Rate', 'y': 'RP Gain',
+        'x_title': '<b>픽률 (%)</b>', 'y_title': '<b>RP 획득량</b>',
+        'hovertemplate': '<b>%{text}</b><br>픽률: %{x:.2f}%<br>RP 획득량: %{y:.2f}<extra></extra>',
+        'pick_rate_customdata': False,
+        'lines': [('h', 'RP Gain', '<b>전체 평균 RP 획득량: {:.2f}</b>', 'bottom right', 'orange')],
+    },
+    'rp_vs_win': {
+        'x': 'RP Gain', 'y': 'Win Rate',
+        'x_title': '<b>RP 획득량</b>', 'y_title': '<b>승률 (%)</b>',
+        'hovertemplate': '<b>%{text}</b><br>RP 획득량: %{x:.2f}<br>승률: %{y:.2f}%<br>픽률: %{customdata[0]:.2f}%<extra></extra>',
+        'pick_rate_customdata': True,
+        'lines': [('v', 'RP Gain', '<b>전체 평균 RP 획득량: {:.2f}</b>', 'bottom right', 'orange'),
+                  ('h', 'Win Rate', '<b>전체 평균 승률: {:.2f}</b>', 'bottom right', 'green')],
+    },
+}
+
+_TEMPLATE_LAYOUT_KEYS = ['autotypenumbers', 'font', 'hovermode', 'hoverlabel', 'xaxis', 'yaxis',
+                         'shapedefaults', 'annotationdefaults']
+# Read from plotly's package data: building pio.templates['plotly'] costs ~0.1s at import
+_template_layout = json.loads(pkgutil.get_data('plotly', 'package_data/templates/plotly.json'))['layout']
+
+# Only the parts of the default template a 2D scatter uses
+BASE_LAYOUT = {
+    'template': {'layout': {key: _template_layout[key] for key in _TEMPLATE_LAYOUT_KEYS}},
+    'legend': {'title': {'text': ''}, 'tracegroupgap': 0, 'itemsizing': 'constant',
+               'orientation': 'h', 'yanchor': 'bottom', 'y': 1, 'xanchor': 'left', 'x': 0.01,
+               'bgcolor': 'GhostWhite', 'bordercolor': 'LightSteelBlue', 'borderwidth': 1},
+    'margin': {'t': 40, 'l': 40, 'r': 40, 'b': 40},
+    'plot_bgcolor': 'white',
+    'paper_bgcolor': 'white',
+    'hovermode': 'closest',
+    'dragmode': 'pan',
+}
+_AXIS_STYLE = {'showgrid': True, 'gridwidth': 0.5, 'gridcolor': 'WhiteSmoke'}
+
+
+def label_positions(x, y, texts, rows, pick_rate_order):
+    """Plotly textposition of each of ``rows``, labels placed among those rows only.
+
+    Most picked characters get first choice of label position; ``pick_rate_order``
+    is the whole table's rows by descending pick rate, precomputed at publish.
+    """
+    selected = np.zeros(len(x), dtype=bool)
+    selected[rows] = True
+    order = pick_rate_order[selected[pick_rate_order]]
+    positions = np.empty(len(x), dtype=object)
+    positions[order] = place_labels(x[order], y[order], texts[order])
+    return positions[rows].tolist()
+
+
+def marker_sizes(pick_rate, aggregates):
+    # Scale point sizes by pick rate relative to the whole table, not just the filtered rows
+    summary = aggregates['pick_rate']
+    return scale_sizes(pick_rate, summary['min'], summary['max'])
+
+
+def scale_sizes(pick_rate, low, high):
+    # ``low`` and ``high`` may be per-point arrays when tables of different ranges are stacked
+    return 3 + (pick_rate - low) / (high - low) * 120
+
+
+def typed_array(values):
+    # plotly.js decodes {'dtype', 'bdata'} straight into a typed array
+    values = np.ascontiguousarray(values, dtype='<f8')
+    array = {'dtype': 'f8', 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+    if values.ndim > 1:
+        array['shape'] = ', '.join(str(size) for size in values.shape)
+    return array
+
+
+def reference_line(axis, value, text, position, color, xref='x', yref='y'):
+    # Same shape and annotation as Figure.add_hline / add_vline with annotation_position
+    vertical, horizontal = position.split(' ')
+    shape = {'type': 'line', 'line': {'color': color, 'dash': 'dot'}}
+    annotation = {'text': text, 'showarrow': False, 'font': {'size': 12, 'color': color}}
+    if axis == 'h':
+        shape.update(x0=0, x1=1, xref=f'{xref} domain', y0=value, y1=value, yref=yref)
+        annotation.update(x=1 if horizontal == 'right' else 0, xanchor=horizontal, xref=f'{xref} domain',
+                          y=value, yanchor='top' if vertical == 'bottom' else 'bottom', yref=yref)
+    else:
+        shape.update(x0=value, x1=value, xref=xref, y0=0, y1=1, yref=f'{yref} domain')
+        annotation.update(x=value, xanchor='left' if horizontal == 'right' else 'right', xref=xref,
+                          y=0 if vertical == 'bottom' else 1, yanchor=vertical, yref=f'{yref} domain')
+    return shape, annotation
+
+
+def plot_layout(comparison, aggregates):
+    spec = COMPARISONS[comparison]
+    shapes, annotations = [], []
+    for axis, metric, text, position, color in spec['lines']:
+        value = aggregates['weighted_mean'][metric]
+        shape, annotation = reference_line(axis, value, text.format(value), position, color)
+        shapes.append(shape)
+        annotations.append(annotation)
+    return {**BASE_LAYOUT,
+            'xaxis': {'title': {'text': spec['x_title']}, **_AXIS_STYLE},
+            'yaxis': {'title': {'text': spec['y_title']}, **_AXIS_STYLE},
+            'shapes': shapes, 'annotations': annotations}
+
+
+def trace_template(comparison, n_points, render_mode=None):
+    """Everything of a trace except its points, names and colour."""
+    spec = COMPARISONS[comparison]
+    if render_mode is None:
+        render_mode = 'webgl' if n_points > SCATTERGL_THRESHOLD else 'svg'
+    trace = {'type': 'scattergl' if render_mode == 'webgl' else 'scatter', 'mode': 'markers+text',
+             'showlegend': True, 'hovertemplate': spec['hovertemplate']}
+    if not spec['pick_rate_customdata']:
+        trace['hoverinfo'] = 'text'
+    return trace
+
+
+def scatter_points(df, comparison, aggregates, rows=None):
+    """Per-point arrays of a comparison for ``rows`` of ``df`` (default all), in row order.
+
+    Columns are read as NumPy views of the snapshot's table, so only the
+    selected values are copied.
+    """
+    spec = COMPARISONS[comparison]
+    rows = np.arange(len(df)) if rows is None else rows
+    x = df[spec['x']].to_numpy(dtype=float)
+    y = df[spec['y']].to_numpy(dtype=float)
+    texts = aggregates['characters']
+    pick_rate = df['Pick Rate'].to_numpy(dtype=float)[rows]
+    return {
+        'x': x[rows],
+        'y': y[rows],
+        'text': texts[rows].tolist(),
+        'textposition': label_positions(x, y, texts, rows, aggregates['pick_rate_order']),
+        'size': marker_sizes(pick_rate, aggregates),
+        'pick_rate': pick_rate,
+    }
+
+
+def size_reference(sizes):
+    # Marker area scale computed as px.scatter does it for size_max=MAX_MARKER_SIZE
+    return sizes.max() / MAX_MARKER_SIZE ** 2 if len(sizes) and sizes.max() > 0 else 1
+
+
+def scatter_figure(df, comparison, aggregates, rows=None, highlight=None, highlight_name=None, render_mode=None):
+    """Build the figure dict of ``comparison`` for ``rows`` of ``df`` (default all).
+
+    ``highlight`` is a boolean array over the selected rows; those points get
+    their own Crimson trace named ``highlight_name``, drawn on top of the rest.
+    """
+    spec = COMPARISONS[comparison]
+    points = scatter_points(df, comparison, aggregates, rows)
+    n_points = len(points['x'])
+    template = trace_template(comparison, n_points, render_mode)
+    sizeref = size_reference(points['size'])
+
+    highlight = np.zeros(n_points, dtype=bool) if highlight is None else np.asarray(highlight, dtype=bool)
+    groups = [(~highlight, WHOLE_NAME, DEFAULT_COLOR), (highlight, highlight_name, HIGHLIGHT_COLOR)]
+
+    data = []
+    for mask, name, color in groups:
+        members = np.flatnonzero(mask)
+        if len(members) == 0:
+            continue
+        trace = {**template, 'name': name, 'legendgroup': name,
+                 'x': typed_array(points['x'][members]),
+                 'y': typed_array(points['y'][members]),
+                 'text': [points['text'][i] for i in members],
+                 'textposition': [points['textposition'][i] for i in members],
+                 'marker': {'color': color, 'size': typed_array(points['size'][members]),
+                            'sizemode': 'area', 'sizeref': sizeref, 'symbol': 'circle'}}
+        if spec['pick_rate_customdata']:
+            trace['customdata'] = typed_array(points['pick_rate'][members, None])
+        data.append(trace)
+    return {'data': data, 'layout': plot_layout(comparison, aggregates)}
+
+
+def client_figure_data(df, comparison, aggregates, render_mode=None):
+    """Everything assets/clientside.js needs to draw ``comparison`` for any slider range and role.
+
+    The layout and the trace template are sent as they are; the per-point
+    arrays are sent as plain lists together with each point's pick rate, so
+    the browser can filter by the slider and split out the highlighted role.
+    """
+    points = scatter_points(df, comparison, aggregates)
+    trace = trace_template(comparison, len(df), render_mode)
+    trace['marker'] = {'sizemode': 'area', 'sizeref': size_reference(points['size']), 'symbol': 'circle'}
+    if COMPARISONS[comparison]['pick_rate_customdata']:
+        points['customdata'] = [[value] for value in points['pick_rate'].tolist()]
+    return {
+        'layout': plot_layout(comparison, aggregates),
+        'trace': trace,
+        'points': {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in points.items()},
+        'colors': {'highlight': HIGHLIGHT_COLOR, 'rest': DEFAULT_COLOR},
+    }
+
+
+def panel_axes(index):
+    # Plotly names the first subplot's axes x/y and the rest x2/y2, x3/y3...
+    suffix = '' if index == 0 else str(index + 1)
+    return f'x{suffix}', f'y{suffix}'
+
+
+def small_multiples_layout(comparison, keys, aggregates, tier_labels, version_labels, gap=0.03):
+    """Grid layout of one panel per ``(tier, version)`` key: tiers by row, versions by column, axes shared."""
+    spec = COMPARISONS[comparison]
+    tiers = list(dict.fromkeys(tier for tier, _ in keys))
+    versions = list(dict.fromkeys(version for _, version in keys))
+    width = (1 - gap * (len(versions) - 1)) / len(versions)
+    height = (1 - gap * 2 * (len(tiers) - 1)) / len(tiers)
+
+    layout = {**BASE_LAYOUT, 'margin': {'t': 60, 'l': 60, 'r': 20, 'b': 50}}
+    shapes, annotations = [], []
+    for index, (tier, version) in enumerate(keys):
+        row, column = tiers.index(tier), versions.index(version)
+        xaxis, yaxis = panel_axes(index)
+        x0 = column * (width + gap)
+        y1 = 1 - row * (height + gap * 2)
+        x_layout = {**_AXIS_STYLE, 'domain': [x0, x0 + width], 'anchor': yaxis,
+                    'showticklabels': row == len(tiers) - 1,
+                    'title': {'text': spec['x_title'] if row == len(tiers) - 1 else ''}}
+        y_layout = {**_AXIS_STYLE, 'domain': [y1 - height, y1], 'anchor': xaxis,
+                    'showticklabels': column == 0,
+                    'title': {'text': spec['y_title'] if column == 0 else ''}}
+        if index:
+            # Every panel zooms and pans with the first one, so the tables stay comparable
+            x_layout['matches'], y_layout['matches'] = 'x', 'y'
+        layout['xaxis' + xaxis[1:]] = x_layout
+        layout['yaxis' + yaxis[1:]] = y_layout
+        annotations.append({'text': f"<b>{tier_labels.get(tier, tier)} · {version_labels.get(version, version)}</b>",
+                            'showarrow': False, 'font': {'size': 12}, 'xref': f'{xaxis} domain', 'x': 0.5,
+                            'xanchor': 'center', 'yref': f'{yaxis} domain', 'y': 1, 'yanchor': 'bottom'})
+        # Each panel's own weighted averages, without their labels: twelve of them would not fit
+        for axis, metric, text, position, color in spec['lines']:
+            shape, _ = reference_line(axis, aggregates[(tier, version)]['weighted_mean'][metric], '', position,
+                                      color, xaxis, yaxis)
+            shapes.append(shape)
+    layout['shapes'] = shapes
+    layout['annotations'] = annotations
+    return layout
+
+
+def small_multiples_figure(tables, aggregates, keys, comparison, selected_range=None, highlights=None,
+                           highlight_name=None, tier_labels=None, version_labels=None, render_mode=None):
+    """One scatter panel of ``comparison`` per key of ``keys``, all computed in one pass.
+
+    The tables are stacked into flat arrays with a panel index, so the pick
+    rate filter, marker sizes and highlight are each one vectorized operation
+    over every panel; the traces are then cut out of the sorted arrays.
+    ``highlights`` maps keys to boolean masks over their table (as from
+    ``aggregates.highlight_mask``); highlighted points of every panel share one
+    legend entry. Panels have hover text and no labels.
+    """
+    spec = COMPARISONS[comparison]
+    lengths = np.array([len(tables[key]) for key in keys])
+    panel = np.repeat(np.arange(len(keys)), lengths)
+    x = np.concatenate([tables[key][spec['x']].to_numpy(dtype=float) for key in keys])
+    y = np.concatenate([tables[key][spec['y']].to_numpy(dtype=float) for key in keys])
+    pick_rate = np.concatenate([tables[key]['Pick Rate'].to_numpy(dtype=float) for key in keys])
+    texts = np.concatenate([aggregates[key]['characters'] for key in keys])
+    highlight = np.concatenate([np.zeros(length, dtype=bool) if (highlights or {}).get(key) is None
+                                else np.asarray(highlights[key], dtype=bool)
+                                for key, length in zip(keys, lengths)])
+
+    # Sizes relative to each point's own table, as in the single chart
+    low = np.array([aggregates[key]['pick_rate']['min'] for key in keys])[panel]
+    high = np.array([aggregates[key]['pick_rate']['max'] for key in keys])[panel]
+    sizes = scale_sizes(pick_rate, low, high)
+
+    rows = np.arange(len(pick_rate))
+    if selected_range is not None:
+        rows = np.flatnonzero((pick_rate >= selected_range[0]) & (pick_rate <= selected_range[1]))
+    # One sort groups the points by panel, then highlighted or not; the traces are slices of it
+    group = panel[rows] * 2 + highlight[rows]
+    sort = np.argsort(group, kind='stable')
+    order = rows[sort]
+    bounds = np.searchsorted(group[sort], np.arange(2 * len(keys) + 1))
+
+    template = {**trace_template(comparison, len(order), render_mode), 'mode': 'markers'}
+    template['marker'] = {'sizemode': 'area', 'sizeref': size_reference(sizes[order]), 'symbol': 'circle'}
+    groups = [(WHOLE_NAME, DEFAULT_COLOR), (highlight_name, HIGHLIGHT_COLOR)]
+    legend_shown = set()
+    data = []
+    for index in range(len(keys)):
+        xaxis, yaxis = panel_axes(index)
+        for highlighted, (name, color) in enumerate(groups):
+            members = order[bounds[2 * index + highlighted]:bounds[2 * index + highlighted + 1]]
+            if len(members) == 0:
+                continue
+            trace = {**template, 'name': name, 'legendgroup': name, 'showlegend': name not in legend_shown,
+                     'xaxis': xaxis, 'yaxis': yaxis,
+                     'x': typed_array(x[members]), 'y': typed_array(y[members]), 'text': texts[members].tolist(),
+                     'marker': {**template['marker'], 'color': color, 'size': typed_array(sizes[members])}}
+            if spec['pick_rate_customdata']:
+                trace['customdata'] = typed_array(pick_rate[members, None])
+            legend_shown.add(name)
+            data.append(trace)
+    return {'data': data, 'layout': small_multiples_layout(comparison, keys, aggregates,
+                                                           tier_labels or {}, version_labels or {})}
@@ -1,59 +1,37 @@
 import uuid
 import traceback
-import datetime
 import threading
 import dash
-import copy
 import time
 import threading
 import json
-from dash import dcc, html, Input, Output, State, ALL
+import numpy as np
+from flask import Response, request, abort
+from dash import dcc, html, Input, Output, State, ALL, MATCH, ClientsideFunction, Patch, set_props
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 
 from config import GLOBAL_FONT_FAMILY, PRIMARY_COLOR, BACKGROUND_COLOR, TEXT_COLOR
-from config import default_roles_mapping
-from config import role_translation
+from config import default_roles_mapping, url_mapping
+from config import role_translation, tier_translation, version_translation
+from config import PICK_RATE_SLIDER_STEP, CLIENTSIDE_FILTERING, INGEST_MODE, LOADING_RETRY_AFTER
 import dash_bootstrap_components as dbc
-from update_table import update_database, update_last_time, run_periodic_update, get_last_update_time, get_database
-from plot import customize_plot, plot_top3_vs_winrate, pick_pick_vs_win, plot_pick_vs_rp, plot_rp_vs_win, plot_tk_vs_top3
+import live_data
+from live_data import get_last_update_time, watch_snapshot_store, load_last_update_time, readiness
+from snapshot import get_snapshot, add_publish_listener
+from aggregates import highlight_mask
+from session_tracker import session_tracker
+from figure_cache import figure_cache, quantize_range, group_hash
+from metrics import Gauge, timed_callback, render as render_metrics
+from plot import COMPARISONS, scatter_figure, client_figure_data, small_multiples_figure
+from compression import init_compression
+from data_api import init_data_api
 from styles import dropdown_style, button_style, container_style, default_character_style, selected_character_style
 
 
-# 세션 정보를 저장할 딕셔너리
-running_session_ids = {}
-
 def generate_session_id():
     return str(uuid.uuid4())
 
-def update_session_activity(session_id):
-    running_session_ids[session_id] = datetime.datetime.now()
-
-def remove_expired_sessions():
-    def trim_log_file(file_path, max_lines=2000):
-        with open(file_path, 'r', encoding='UTF-8') as file:
-            lines = file.readlines()
-
-        if len(lines) > max_lines:
-            with open(file_path, 'w', encoding='UTF-8') as file:
-                file.writelines(lines[-max_lines:])
-
-    while True:
-        current_time = datetime.datetime.now()
-        expired_sessions = [session_id for session_id, last_active in running_session_ids.items()
-                            if (current_time - last_active).total_seconds() > 300]
-        for session_id in expired_sessions:
-            del running_session_ids[session_id]
-
-        # running_session_ids를 파일에 로깅
-        with open("logs/session_log.txt", "a", encoding='UTF-8') as log_file:
-            now = datetime.datetime.now().strftime("%Y-%d-%m %H:%M:%S")
-            log_file.write(f"[{now}]: 현재 활성 세션 - {list(running_session_ids.keys())}\n")
-
-        # Check and trim the log file if it exceeds 200,000 lines
-        trim_log_file("logs/session_log.txt")
-
-        time.sleep(300)  # 매 300초마다 실행
-
 def generate_character_grid(characters, selected_characters):
     return html.Div(
         [dbc.Row(
@@ -79,17 +57,40 @@ external_css = [
     '/assets/custom_styles.css'  # Path to your custom CSS file
 ]
 app = dash.Dash(__name__, external_stylesheets=external_css, title='ER Plot')
+# Built once; clicks only ever update the style of one box
+character_grid = generate_character_grid(default_roles_mapping['Reference'], [])
 server = app.server
+init_compression(server)
+init_data_api(server)
+
 
+graph_style = {'width': '100%', 'height': '88vh'}
 
-app.layout = html.Div([
+main_layout = html.Div([
     # Fixed Div for selection bars
     dcc.Store(id='session_roles_mapping', storage_type='memory'),
     dcc.Store(id='session-id', storage_type='session'),
+    dcc.Store(id='figure-data', storage_type='memory'),
+    dcc.Store(id='data-generation', storage_type='memory'),
+    dcc.Store(id='role-config', storage_type='memory',
+              data={'mapping': {role: characters for role, characters in default_roles_mapping.items() if role != 'Reference'},
+                    'translation': role_translation}),
     dcc.Interval(id='init-interval', interval=1, n_intervals=0),
     html.Div([
         html.Div(id='selected-characters', style={'display': 'none'}),
-        dcc.Store(id='stored-selected-characters', storage_type='memory'),
+        dcc.Store(id='stored-selected-characters', data=[], storage_type='memory'),
+        # One chart, or every tier and period side by side
+        dcc.Dropdown(
+            id='view-dropdown',
+            options=[
+                {'label': '단일 차트', 'value': 'single'},
+                {'label': '전체 티어·기간 비교', 'value': 'grid'},
+            ],
+            value='single',  # Default value
+            clearable=False,
+            style=dropdown_style,
+            className='custom-dropdown'
+        ),
         # Dropdown for Comparison selection
         dcc.Dropdown(
             id='comparison-dropdown',
@@ -107,12 +108,7 @@ app.layout = html.Div([
         ),
         dcc.Dropdown(
             id='version-dropdown',
-            options=[
-                {'label': '이전 버전', 'value': 'prevPatch'},
-                {'label': '현재 버전', 'value': 'currentPatch'},
-                {'label': '현재 버전 (최근 3일)', 'value': '3day'},
-                {'label': '현재 버전 (최근 7일)', 'value': '7day'}
-            ],
+            options=[{'label': label, 'value': version} for version, label in version_translation.items()],
             value='currentPatch',  # Default value
             style=dropdown_style,
             className='custom-dropdown'
@@ -120,11 +116,7 @@ app.layout = html.Div([
         # Dropdown for Tier selection
         dcc.Dropdown(
             id='tier-dropdown',
-            options=[
-                {'label': 'in 1000', 'value': 'in_1000'},
-                {'label': '다이아몬드+', 'value': 'diamond_plus'},
-                {'label': '플레티넘+', 'value': 'platinum_plus'},
-            ],
+            options=[{'label': label, 'value': tier} for tier, label in tier_translation.items()],
             value='platinum_plus',  # Default value
             clearable=False,
             style=dropdown_style,
@@ -173,6 +165,7 @@ app.layout = html.Div([
         [
             dbc.ModalHeader(dbc.ModalTitle("유저 그룹 정의 편집")),
             dbc.ModalBody(
+                character_grid,
                 id='modal-body',
                 style={'maxHeight': 'calc(100vh - 210px)', 'overflowY': 'auto'}
             ),
@@ -225,7 +218,7 @@ app.layout = html.Div([
             max=1,  # Default maximum
             value=[0, 1],  # Default value
             updatemode='drag',
-            step=0.02,
+            step=PICK_RATE_SLIDER_STEP,
             tooltip={"placement": "bottom", "always_visible": True}
         ),
         ], id='slider-container', style={
@@ -249,7 +242,15 @@ app.layout = html.Div([
                     'showTips': False, 'displaylogo': False,
                     'dragmode': 'pan',
                     'modeBarButtonsToRemove': ['lasso2d', 'resetScale2d', 'select']},  # Hide modebar if not necessary
-            style={'width': '100%', 'height': '88vh'}  # Adjusted for responsiveness
+            style=graph_style  # Adjusted for responsiveness
+        ),
+        dcc.Graph(
+            id='grid-plot',
+            config={'scrollZoom': True, 'displayModeBar': True,
+                    'showTips': False, 'displaylogo': False,
+                    'dragmode': 'pan',
+                    'modeBarButtonsToRemove': ['lasso2d', 'resetScale2d', 'select']},
+            style={**graph_style, 'display': 'none'}
         ),
         html.Div(
             id='last-update-time',
@@ -295,13 +296,40 @@ app.layout = html.Div([
     'backgroundColor': BACKGROUND_COLOR
 })
 
-@app.callback(
+# Shown instead of the app until this process has a snapshot; reloads itself once /ready says so
+loading_layout = html.Div([
+    html.Div(
+        "데이터를 불러오는 중입니다. 잠시 후 자동으로 새로고침됩니다.",
+        id='loading-message',
+        style={'fontFamily': GLOBAL_FONT_FAMILY, 'color': TEXT_COLOR, 'fontSize': '18px',
+               'textAlign': 'center', 'paddingTop': '20vh'}
+    ),
+    dcc.Interval(id='loading-poll', interval=LOADING_RETRY_AFTER * 1000, n_intervals=0),
+], style={
+    'fontFamily': 'Arial, sans-serif',
+    'backgroundColor': BACKGROUND_COLOR
+})
+
+
+def serve_layout():
+    return main_layout if get_snapshot().ready else loading_layout
+
+
+app.layout = serve_layout
+app.validation_layout = html.Div([main_layout, loading_layout])
+
+app.clientside_callback(
+    ClientsideFunction(namespace='er_plot', function_name='reload_when_ready'),
+    Output('loading-poll', 'disabled'),
+    [Input('loading-poll', 'n_intervals')],
+    prevent_initial_call=True
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace='er_plot', function_name='slider_text'),
     Output('slider-value-container', 'children'),
     [Input('pick-rate-slider', 'value'), Input('comparison-dropdown', 'value')]
 )
-def update_output(value, comparison):
-    min_value, max_value = value
-    return f'선택된 유효 픽률 범위: {min_value:.2f}% ~ {max_value:.2f}%'
 
 
 @app.callback(
@@ -310,141 +338,263 @@ def update_output(value, comparison):
     Output('pick-rate-slider', 'value'),
     Output('pick-rate-slider', 'marks'),
     [Input('version-dropdown', 'value'),
-     Input('tier-dropdown', 'value')]
+     Input('tier-dropdown', 'value'),
+     Input('view-dropdown', 'value')]
 )
-def update_slider(version, tier):
-    database = get_database()
-    df_selected = database[(tier, version)]
+@timed_callback
+def update_slider(version, tier, view):
+    snapshot = get_snapshot()
+    if view == 'grid':
+        return grid_slider(snapshot)
+    aggregates = snapshot.aggregates.get((tier, version))
+    if aggregates is None:
+        # Nothing loaded for this view yet; leave the slider as it is
+        raise PreventUpdate
+    pick_rate = aggregates['pick_rate']
+    min_value, max_value = pick_rate['min'], pick_rate['max']
 
-    # Calculate quantiles for the slider
-    quantile_values = df_selected['Pick Rate'].quantile([0.25, 0.5, 0.75])
+    # Create the marks with character labels
+    marks = {
+        str(min_value): {'label': pick_rate['min_character'], 'style': {'color': '#f50'}},
+        **{str(key): {'label': value, 'style': {'color': '#555'}} for key, value in pick_rate['quantiles'].items()},
+        str(max_value): {'label': pick_rate['max_character'], 'style': {'color': '#77b0b1'}}
+    }
 
-    # Find the closest characters corresponding to the quantiles
-    characters_at_quantiles = {}
-    for quantile, value in quantile_values.items():
-        closest_index = (df_selected['Pick Rate'] - value).abs().idxmin()
-        characters_at_quantiles[value] = df_selected.loc[closest_index, 'Character']
+    return 0, 1.1 * max_value, default_slider_range(pick_rate), marks
 
-    # Calculate min and max for the slider
-    min_value = df_selected['Pick Rate'].min() if 'Pick Rate' in df_selected.columns else 0
-    max_value = df_selected['Pick Rate'].max() if 'Pick Rate' in df_selected.columns else 1
 
-    # Find the characters corresponding to the min and max pick rate
-    min_char = df_selected.loc[df_selected['Pick Rate'].idxmin(), 'Character']
-    max_char = df_selected.loc[df_selected['Pick Rate'].idxmax(), 'Character']
+def default_slider_range(pick_rate):
+    return [0.3, 1.1 * pick_rate['max']]
 
-    # Create the marks with character labels
+
+def grid_slider(snapshot):
+    # The grid filters every table with one range, so the slider spans the widest of them
+    summaries = [aggregates['pick_rate'] for aggregates in snapshot.aggregates.values()]
+    if not summaries:
+        raise PreventUpdate
+    lowest = min(summaries, key=lambda summary: summary['min'])
+    highest = max(summaries, key=lambda summary: summary['max'])
     marks = {
-        str(min_value): {'label': min_char, 'style': {'color': '#f50'}},
-        **{str(key): {'label': value, 'style': {'color': '#555'}} for key, value in characters_at_quantiles.items()},
-        str(max_value): {'label': max_char, 'style': {'color': '#77b0b1'}}
+        str(lowest['min']): {'label': lowest['min_character'], 'style': {'color': '#f50'}},
+        str(highest['max']): {'label': highest['max_character'], 'style': {'color': '#77b0b1'}}
     }
+    return 0, 1.1 * highest['max'], default_slider_range(highest), marks
 
-    # Adjust the slider value if necessary
-    slider_value = [0.3, 1.1 * max_value]
 
-    return 0, 1.1 * max_value, slider_value, marks
+def role_characters(role, session_roles_mapping):
+    # Predefined roles come straight from config; the session store only holds the user defined group
+    if role == 'User Defined':
+        return (session_roles_mapping or {}).get(role, [])
+    return default_roles_mapping.get(role)
+
+
+def build_figure(snapshot, tier, version, comparison, role, selected_range, characters):
+    df = snapshot.tables[(tier, version)]
+    aggregates = snapshot.aggregates[(tier, version)]
+
+    # Row indices instead of a filtered copy of the table
+    pick_rate = df['Pick Rate'].to_numpy()
+    rows = np.flatnonzero((pick_rate >= selected_range[0]) & (pick_rate <= selected_range[1]))
+    # Membership masks are precomputed for the whole table when the snapshot is published
+    highlight = highlight_mask(df, aggregates, role, characters)
+    if highlight is not None:
+        highlight = highlight[rows]
+
+    return scatter_figure(df, comparison, aggregates, rows, highlight, role_translation[role])
+
+
+if CLIENTSIDE_FILTERING:
+    # Slider drags and role changes are redrawn in the browser from figure-data
+    app.clientside_callback(
+        ClientsideFunction(namespace='er_plot', function_name='filter_figure'),
+        Output('scatter-plot', 'figure'),
+        [Input('figure-data', 'data'),
+         Input('pick-rate-slider', 'value'),
+         Input('role-dropdown', 'value'),
+         Input('confirm-click-flag', 'data'),
+         Input('session_roles_mapping', 'data')],
+        [State('role-config', 'data')]
+    )
 
+    # figure-data is fetched with a GET so the browser's HTTP cache can revalidate it by ETag
+    app.clientside_callback(
+        ClientsideFunction(namespace='er_plot', function_name='fetch_figure_data'),
+        Output('figure-data', 'data'),
+        [Input('version-dropdown', 'value'),
+         Input('tier-dropdown', 'value'),
+         Input('comparison-dropdown', 'value'),
+         Input('data-generation', 'data')]
+    )
 
-@app.callback(
-    Output('scatter-plot', 'figure'),
-    [Input('pick-rate-slider', 'value'),
-     Input('version-dropdown', 'value'),
-     Input('tier-dropdown', 'value'),
-     Input('comparison-dropdown', 'value'),
-     Input('role-dropdown', 'value'),
-     Input('confirm-click-flag', 'data')],  # Add the confirm-click-flag input
-    [State('session_roles_mapping', 'data')],
-    prevent_initial_call=True
-)
-def update_figure(selected_range, version, tier, comparison, role, confirm_flag, session_roles_mapping):
-    if session_roles_mapping is None:
-        session_roles_mapping = copy.deepcopy(default_roles_mapping)
+    def figure_data_json(snapshot, tier, version, comparison):
+        cache_key = (snapshot.generation, tier, version, comparison, 'client')
+        payload = figure_cache.get_json(cache_key)
+        if payload is not None:
+            return payload
+
+        # The whole table, unfiltered and without a highlight; the browser does the rest
+        data = client_figure_data(snapshot.tables[(tier, version)], comparison, snapshot.aggregates[(tier, version)])
+        data['generation'] = snapshot.generation
+        payload = json.dumps(data, ensure_ascii=False)
+        figure_cache.put(cache_key, payload)
+        return payload
+
+    @server.route('/figure-data')
+    @timed_callback
+    def figure_data():
+        tier, version, comparison = (request.args.get(name) for name in ('tier', 'version', 'comparison'))
+        snapshot = get_snapshot()
+        if not snapshot.ready:
+            return loading_response()
+        if (tier, version) not in snapshot.tables or comparison not in COMPARISONS:
+            abort(404)
+
+        # Same generation and inputs, same payload: a revisited view costs a 304 and no body
+        etag = f"{snapshot.generation}-{tier}-{version}-{comparison}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(figure_data_json(snapshot, tier, version, comparison), mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
+
+    @app.callback(
+        Output('data-generation', 'data'),
+        [Input('interval-component', 'n_intervals')],
+        [State('data-generation', 'data')],
+        prevent_initial_call=True
+    )
+    @timed_callback
+    def update_data_generation(n, known_generation):
+        # Only a new snapshot makes the browser fetch figure-data again
+        generation = get_snapshot().generation
+        if generation == known_generation:
+            return dash.no_update
+        return generation
+else:
+    @app.callback(
+        Output('scatter-plot', 'figure'),
+        [Input('pick-rate-slider', 'value'),
+         Input('version-dropdown', 'value'),
+         Input('tier-dropdown', 'value'),
+         Input('comparison-dropdown', 'value'),
+         Input('role-dropdown', 'value'),
+         Input('confirm-click-flag', 'data')],  # Add the confirm-click-flag input
+        [State('session_roles_mapping', 'data')],
+        prevent_initial_call=True
+    )
+    @timed_callback
+    def update_figure(selected_range, version, tier, comparison, role, confirm_flag, session_roles_mapping):
+        snapshot = get_snapshot()
+        if (tier, version) not in snapshot.tables:
+            raise PreventUpdate
+        return cached_figure(snapshot, tier, version, comparison, role, selected_range,
+                             role_characters(role, session_roles_mapping))
 
-    database = get_database()
-    df = database[(tier, version)]
+    def cached_figure(snapshot, tier, version, comparison, role, selected_range, characters):
+        selected_range = quantize_range(selected_range)
+        cache_key = (snapshot.generation, tier, version, comparison, role, selected_range,
+                     group_hash(characters) if role != 'Whole' else None)
+        fig = figure_cache.get(cache_key)
+        if fig is not None:
+            return fig
 
-    filtered_df = df[(df['Pick Rate'] >= selected_range[0]) & (df['Pick Rate'] <= selected_range[1])]
-    filtered_df_copied = copy.deepcopy(filtered_df)
-    if role == 'User Defined':
-        filtered_df_copied.loc[:, '역할군'] = filtered_df['Character'].apply(
-            lambda x: role_translation[role] if any(item in x for item in session_roles_mapping[role]) else '전체'
-        )
-    elif role != 'Whole':
-        # If a specific role is selected, characters in that role will have a different color
-        filtered_df_copied.loc[:, '역할군'] = filtered_df['Character'].apply(lambda x: role_translation[role] if x in session_roles_mapping[role] else '전체')
-    else:
-        # If 'Whole' is selected, all characters have the same color
-        filtered_df_copied.loc[:, '역할군'] = '전체'
-    filtered_df = filtered_df_copied
-
-    filtered_df.loc[:, 'sort_column'] = filtered_df['역할군'] == '전체'
-    filtered_df.sort_values(by='sort_column', inplace=True, ascending=False)
-    filtered_df.drop('sort_column', axis=1, inplace=True)
-
-    if comparison == 'top3_vs_winrate':
-        fig = plot_top3_vs_winrate(filtered_df, df, role, role_translation)
-    elif comparison == 'pick_vs_win':
-        fig = pick_pick_vs_win(filtered_df, df, role, role_translation)
-    elif comparison == 'pick_vs_rp':
-        fig = plot_pick_vs_rp(filtered_df, df, role, role_translation)
-    elif comparison == 'rp_vs_win':
-        fig = plot_rp_vs_win(filtered_df, df, role, role_translation)
-    elif comparison == 'tk_vs_top3':
-        fig = plot_tk_vs_top3(filtered_df, df, role, role_translation)
-
-    fig = customize_plot(fig)
+        fig = build_figure(snapshot, tier, version, comparison, role, selected_range, characters)
+        figure_cache.put(cache_key, json.dumps(fig, ensure_ascii=False))
 
-    return fig
+        return fig
 
 
 @app.callback(
-    [Output('stored-selected-characters', 'data'),
-     Output({'type': 'char-box', 'index': ALL}, 'style')],
-    [Input({'type': 'char-box', 'index': ALL}, 'n_clicks'),
-     Input('reset-modal', 'n_clicks'),
-     Input('modal-edit-user-defined-roles', 'is_open'),],
-    [State({'type': 'char-box', 'index': ALL}, 'id'),
-     State({'type': 'char-box', 'index': ALL}, 'style'),
-     State('stored-selected-characters', 'data'),
-     State('session_roles_mapping', 'data')],
+    Output('scatter-plot', 'style'),
+    Output('grid-plot', 'style'),
+    Output('tier-dropdown', 'disabled'),
+    Output('version-dropdown', 'disabled'),
+    [Input('view-dropdown', 'value')],
     prevent_initial_call=True
 )
-def update_characters_and_styles(all_n_clicks, n_reset, is_open, all_ids, all_styles, stored_data, session_roles_mapping):
-    if session_roles_mapping is None:
-        session_roles_mapping = copy.deepcopy(default_roles_mapping)
+@timed_callback
+def toggle_view(view):
+    # The grid shows every tier and version, so their dropdowns do nothing there
+    grid = view == 'grid'
+    hidden = {**graph_style, 'display': 'none'}
+    return hidden if grid else graph_style, graph_style if grid else hidden, grid, grid
 
-    ctx = dash.callback_context
-    triggered_id, triggered_prop = ctx.triggered[0]['prop_id'].split('.')
 
-    # If the reset button was clicked, reset all styles to default and clear stored data
-    if triggered_prop == 'n_clicks' and 'reset-modal' in triggered_id:
-        return None, [default_character_style for _ in all_ids]
+def build_grid_figure(snapshot, comparison, role, selected_range, characters):
+    keys = [key for key in url_mapping if key in snapshot.tables]
+    highlights = {key: highlight_mask(snapshot.tables[key], snapshot.aggregates[key], role, characters)
+                  for key in keys}
+    return small_multiples_figure(snapshot.tables, snapshot.aggregates, keys, comparison, selected_range,
+                                  highlights, role_translation[role], tier_translation, version_translation)
 
-    # Initialize new_stored_data with stored_data or an empty list if None
-    new_stored_data = stored_data or []
 
-    # Initialize new_styles with all_styles or a list of default styles if None
-    new_styles = all_styles if all_styles is not None else [default_character_style for _ in all_ids]
+@app.callback(
+    Output('grid-plot', 'figure'),
+    [Input('view-dropdown', 'value'),
+     Input('comparison-dropdown', 'value'),
+     Input('pick-rate-slider', 'value'),
+     Input('role-dropdown', 'value'),
+     Input('confirm-click-flag', 'data')],
+    [State('session_roles_mapping', 'data')],
+    prevent_initial_call=True
+)
+@timed_callback
+def update_grid(view, comparison, selected_range, role, confirm_flag, session_roles_mapping):
+    snapshot = get_snapshot()
+    # Nothing is drawn while the grid is hidden
+    if view != 'grid' or not snapshot.tables:
+        raise PreventUpdate
+    characters = role_characters(role, session_roles_mapping)
+
+    # All twelve tables in one figure: the costliest view, so it is cached per generation like the others
+    selected_range = quantize_range(selected_range)
+    cache_key = (snapshot.generation, 'grid', comparison, role, selected_range,
+                 group_hash(characters) if role != 'Whole' else None)
+    fig = figure_cache.get(cache_key)
+    if fig is not None:
+        return fig
+
+    fig = build_grid_figure(snapshot, comparison, role, selected_range, characters)
+    figure_cache.put(cache_key, json.dumps(fig, ensure_ascii=False))
+    return fig
 
-    # Proceed if the callback was triggered by a character box click
-    if triggered_prop == 'n_clicks' and 'char-box' in triggered_id:
-        # Identify which character box was clicked
-        clicked_index = json.loads(triggered_id)["index"]
-        character_name = session_roles_mapping['Reference'][clicked_index]
 
-        # Toggle selection and styling
-        if character_name in new_stored_data:
-            # Deselect and reset style
-            new_stored_data.remove(character_name)
-            new_styles[clicked_index] = default_character_style
-        else:
-            # Select and update style
-            new_stored_data.append(character_name)
-            new_styles[clicked_index] = selected_character_style
+@app.callback(
+    Output({'type': 'char-box', 'index': MATCH}, 'style'),
+    [Input({'type': 'char-box', 'index': MATCH}, 'n_clicks')],
+    [State({'type': 'char-box', 'index': MATCH}, 'style')],
+    prevent_initial_call=True
+)
+@timed_callback
+def toggle_character(n_clicks, style):
+    # Only the clicked box travels each way, and the selection is patched rather than resent
+    character_name = default_roles_mapping['Reference'][dash.callback_context.triggered_id['index']]
+    selected = Patch()
+    if style == selected_character_style:
+        selected.remove(character_name)
+        style = default_character_style
+    else:
+        selected.append(character_name)
+        style = selected_character_style
+    set_props('stored-selected-characters', {'data': selected})
+    return style
 
-    # Return the updated stored data and the styles for the character boxes
-    return new_stored_data, new_styles
+
+@app.callback(
+    [Output('stored-selected-characters', 'data'),
+     Output({'type': 'char-box', 'index': ALL}, 'style', allow_duplicate=True)],
+    [Input('reset-modal', 'n_clicks')],
+    [State('stored-selected-characters', 'data')],
+    prevent_initial_call=True
+)
+@timed_callback
+def reset_characters(n_reset, stored_data):
+    # Restyle the selected boxes only; the others are left as they are
+    selected = set(stored_data or [])
+    return [], [default_character_style if character in selected else dash.no_update
+                for character in default_roles_mapping['Reference']]
 
 
 @app.callback(
@@ -460,46 +610,37 @@ def update_characters_and_styles(all_n_clicks, n_reset, is_open, all_ids, all_st
      State('session_roles_mapping', 'data')],
     prevent_initial_call=True
 )
+@timed_callback
 def toggle_modal(n_open, n_confirm, n_close, is_open, stored_data, session_roles_mapping):
-    if session_roles_mapping is None:
-        session_roles_mapping = copy.deepcopy(default_roles_mapping)
-
+    # The session store only ever holds the user defined group, and is only sent back when it changes
     ctx = dash.callback_context
     if not ctx.triggered:
-        return is_open, {'clicked': False}, 'Whole', session_roles_mapping
+        return is_open, {'clicked': False}, 'Whole', dash.no_update
 
     button_id = ctx.triggered[0]['prop_id'].split('.')[0]
 
     if button_id == "edit-user-defined-roles-button":
-        return True, {'clicked': False}, dash.no_update, session_roles_mapping
+        return True, {'clicked': False}, dash.no_update, dash.no_update
     elif button_id == "confirm-modal":
         if n_confirm:
-            updated_roles_mapping = session_roles_mapping.copy()
-            updated_roles_mapping['User Defined'] = stored_data or []
-            return False, {'clicked': True}, 'User Defined', updated_roles_mapping
+            return False, {'clicked': True}, 'User Defined', {'User Defined': stored_data or []}
     elif button_id == "close-modal":
-        return False, {'clicked': False}, dash.no_update, session_roles_mapping
-
-    return is_open, {'clicked': False}, dash.no_update, session_roles_mapping
-
-
-@app.callback(
-    Output('modal-body', 'children'),
-    [Input('stored-selected-characters', 'data')],
-    prevent_initial_call=True
-)
-def update_modal_content(selected_characters):
-    if selected_characters is None:
-        selected_characters = []
+        return False, {'clicked': False}, dash.no_update, dash.no_update
 
-    return generate_character_grid(default_roles_mapping['Reference'], selected_characters)
+    return is_open, {'clicked': False}, dash.no_update, dash.no_update
 
 
 @app.callback(
     Output('last-update-time', 'children'),
-    [Input('interval-component', 'n_intervals')]
+    [Input('interval-component', 'n_intervals')],
+    [State('session-id', 'data')]
 )
-def update_last_update_time(n):
+@timed_callback
+def update_last_update_time(n, session_id):
+    # Every open page calls this each minute, so a session stays active while it is open
+    # even when nothing on it changes (with CLIENTSIDE_FILTERING most changes never reach the server)
+    if session_id is not None:
+        session_tracker.touch(session_id)
     return f"마지막 업데이트 시각: {get_last_update_time()}"
 
 
@@ -507,27 +648,126 @@ def update_last_update_time(n):
     Output('reset-modal', 'disabled'),
     [Input('stored-selected-characters', 'data')]
 )
+@timed_callback
 def toggle_reset_button(stored_data):
     # If stored_data is empty or None, disable the button
     return not stored_data
 
 
+# Inputs that mean a user is active, chosen so the browser does not upload the figure with them
+if CLIENTSIDE_FILTERING:
+    # The figure changes without a request, so count figure-data fetches
+    session_inputs = [Input('figure-data', 'modified_timestamp')]
+else:
+    session_inputs = [Input(component, 'value') for component in
+                      ('pick-rate-slider', 'version-dropdown', 'tier-dropdown', 'comparison-dropdown', 'role-dropdown')]
+
+
 @app.callback(
     Output('session-id', 'data'),
-    [Input('scatter-plot', 'figure')],
+    session_inputs,
     [State('session-id', 'data')]
 )
-def manage_session(figure, existing_session_id):
+@timed_callback
+def manage_session(*args):
+    existing_session_id = args[-1]
     if existing_session_id is None:
         new_session_id = generate_session_id()
-        update_session_activity(new_session_id)
+        session_tracker.touch(new_session_id)
         return new_session_id
     else:
-        update_session_activity(existing_session_id)
-        return existing_session_id
+        session_tracker.touch(existing_session_id)
+        return dash.no_update
+
+
+def snapshot_age():
+    published_at = get_snapshot().published_at
+    return None if published_at is None else time.time() - published_at
+
+
+Gauge('er_plot_snapshot_generation', 'Generation of the published snapshot.', lambda: get_snapshot().generation)
+Gauge('er_plot_snapshot_age_seconds', 'Seconds since the snapshot was published.', snapshot_age)
+Gauge('er_plot_figure_cache', 'Figure cache counters (hits, misses and evictions since start, current entries).',
+      lambda: {(name,): value for name, value in figure_cache.stats().items()}, ['stat'])
+Gauge('er_plot_active_sessions', 'Sessions seen within the session timeout.', session_tracker.active_count)
+Gauge('er_plot_ready', 'Readiness of this process (1 for the current status: loading, warming or ready).',
+      lambda: {(readiness()['status'],): 1}, ['status'])
+
+
+@server.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
+def loading_response():
+    # The defined answer to a data request made before any snapshot is loaded
+    response = Response(json.dumps(readiness()), status=503, mimetype='application/json')
+    response.headers['Retry-After'] = str(LOADING_RETRY_AFTER)
+    return response
+
+
+@server.route('/ready')
+def ready():
+    # 200 as soon as a snapshot, however old, is being served; 503 while there is none
+    if not get_snapshot().ready:
+        return loading_response()
+    return Response(json.dumps(readiness()), mimetype='application/json')
+
+
+def warm_figure_cache(snapshot):
+    """Build what the first visitors of each view will ask for, so they do not pay for it."""
+    # Leave room in the cache for the views users actually pick
+    budget = figure_cache.max_entries // 2
+    views = [(tier, version, comparison) for (tier, version) in snapshot.tables for comparison in COMPARISONS]
+    for tier, version, comparison in views[:budget]:
+        if get_snapshot() is not snapshot:
+            return False  # superseded; the newer snapshot gets its own pass
+        if CLIENTSIDE_FILTERING:
+            figure_data_json(snapshot, tier, version, comparison)
+        else:
+            selected_range = default_slider_range(snapshot.aggregates[(tier, version)]['pick_rate'])
+            cached_figure(snapshot, tier, version, comparison, 'Whole', selected_range, None)
+    return True
+
+
+warm_up_requested = threading.Event()
+# Event.set is all a publish does here, so publishing in the gunicorn master before the fork is safe
+add_publish_listener(lambda snapshot: warm_up_requested.set())
+
+
+def run_cache_warmer():
+    """Warm the figure cache for every newly published snapshot, forever; run in a daemon thread."""
+    while True:
+        warm_up_requested.wait()
+        warm_up_requested.clear()
+        snapshot = get_snapshot()
+        if not snapshot.ready:
+            continue
+        try:
+            start = time.perf_counter()
+            if warm_figure_cache(snapshot):
+                live_data.warmed_generation = snapshot.generation
+                print(f"[warm-up] generation {snapshot.generation} in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            print(f"Error warming figure cache: {e}")
+            traceback.print_exc()
 
 
 def safe_run_periodic_update():
+    # The scraping side is only imported when this process refreshes the tables itself
+    from update_table import run_periodic_update, update_database, missing_keys
+    from scheduler import get_scheduler
+
+    # Serve the last good persisted snapshot; the server is already answering with "loading" meanwhile
+    update_database()
+    load_last_update_time()
+    missing = missing_keys()
+    if missing:
+        # Nothing usable on disk for these: fetch them now rather than one refresh interval later
+        print(f"No stored table for {missing}, refreshing them now")
+        for key in missing:
+            get_scheduler().refresh_now(key)
+
     while True:
         try:
             run_periodic_update()
@@ -537,12 +777,13 @@ def safe_run_periodic_update():
             # Optional: Wait some time before restarting
             time.sleep(10)
 
-def safe_remove_expired_sessions():
+def safe_run_session_tracker(report=True):
     while True:
         try:
-            remove_expired_sessions()
+            session_tracker.run(report=report)
+            return
         except Exception as e:
-            print(f"Error in remove_expired_sessions: {e}")
+            print(f"Error in session_tracker: {e}")
             traceback.print_exc()
             # Optional: Wait some time before restarting
             time.sleep(10)
@@ -550,15 +791,21 @@ def safe_remove_expired_sessions():
 
 # Dash 애플리케이션 정의 및 실행
 if __name__ == '__main__':
-    update_database()
-    update_last_time()
+    # Nothing is loaded before the server starts: pages show "data loading" until a snapshot is published
+    if INGEST_MODE == 'thread':
+        # 저장된 스냅샷 로드 후 주기적 업데이트 스레드 시작
+        update_thread = threading.Thread(target=safe_run_periodic_update, daemon=True)
+        update_thread.start()
+    else:
+        # ingest_daemon.py scrapes and commits to the snapshot store; this process only reloads it
+        reload_thread = threading.Thread(target=watch_snapshot_store, daemon=True)
+        reload_thread.start()
 
-    # 주기적 업데이트 스레드 시작
-    update_thread = threading.Thread(target=safe_run_periodic_update, daemon=True)
-    update_thread.start()
+    warm_up_thread = threading.Thread(target=run_cache_warmer, daemon=True)
+    warm_up_thread.start()
 
     # 세션 만료 처리 스레드 시작
-    expiration_thread = threading.Thread(target=safe_remove_expired_sessions, daemon=True)
+    expiration_thread = threading.Thread(target=safe_run_session_tracker, daemon=True)
     expiration_thread.start()
 
     print("[Dash] Run...")
@@ -0,0 +1,160 @@
+import time
+import heapq
+import random
+import threading
+
+from config import url_mapping
+from config import REFRESH_INTERVALS, REFRESH_PRIORITIES, REFRESH_JITTER
+from config import REFRESH_BACKOFF_BASE, REFRESH_BACKOFF_MAX, REFRESH_BATCH_WINDOW
+
+
+class KeyState:
+    __slots__ = ('key', 'interval', 'priority', 'next_run', 'last_run', 'last_success',
+                 'last_duration', 'failures', 'runs')
+
+    def __init__(self, key, interval, priority, next_run):
+        self.key = key
+        self.interval = interval
+        self.priority = priority
+        self.next_run = next_run
+        self.last_run = None
+        self.last_success = None
+        self.last_duration = None
+        self.failures = 0
+        self.runs = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RefreshScheduler:
+    """Runs ``refresh(keys)`` for each url_mapping key on its own cadence.
+
+    Keys are kept in a heap ordered by ``(next_run, priority)``. Successful keys
+    are rescheduled one jittered interval later, failed keys back off
+    exponentially, and keys that fall due together are fetched in one batch.
+    Without ``last_success`` every key first runs one interval from now; with
+    it (``{key: epoch seconds}``, e.g. from a previous process) each key runs
+    one interval after it last succeeded, or at once if that has passed or
+    it has no entry.
+    """
+
+    def __init__(self, refresh, keys=None, clock=time.time, on_batch=None, last_success=None):
+        self.refresh = refresh
+        self.clock = clock
+        # Called with the scheduler after every batch, e.g. to publish its state
+        self.on_batch = on_batch
+        self._cond = threading.Condition()
+        self._heap = []
+        self._states = {}
+        self._stopped = False
+        now = clock()
+        for key in (keys or url_mapping):
+            tier, period = key
+            interval = REFRESH_INTERVALS.get(key, 3 * 3600)
+            state = KeyState(key, interval, REFRESH_PRIORITIES.get(tier, len(REFRESH_PRIORITIES)), 0)
+            self._states[key] = state
+            if last_success is None:
+                # 기존처럼 부팅 직후에는 저장된 데이터를 쓰고 첫 갱신은 한 주기 뒤에 한다
+                self._schedule(state, now + self._jittered(interval))
+                continue
+            # One interval after the key last succeeded, so restarts do not push it back; a key
+            # that is overdue or never succeeded runs at once
+            state.last_success = last_success.get(key)
+            first_run = now if state.last_success is None else state.last_success + self._jittered(interval)
+            self._schedule(state, max(now, first_run))
+
+    def _jittered(self, seconds):
+        return seconds * (1 + random.uniform(-REFRESH_JITTER, REFRESH_JITTER))
+
+    def _schedule(self, state, when):
+        state.next_run = when
+        heapq.heappush(self._heap, (when, state.priority, state.key))
+
+    def _pop_due(self, now):
+        # Stale heap entries (rescheduled since) are skipped lazily
+        due = []
+        while self._heap and self._heap[0][0] <= now + REFRESH_BATCH_WINDOW:
+            when, _, key = heapq.heappop(self._heap)
+            state = self._states[key]
+            if when == state.next_run and key not in due:
+                due.append(key)
+        due.sort(key=lambda key: self._states[key].priority)
+        return due
+
+    def refresh_now(self, key):
+        """Run ``key`` as soon as the scheduler thread wakes up."""
+        with self._cond:
+            self._schedule(self._states[key], self.clock())
+            self._cond.notify()
+
+    def run_batch(self, keys):
+        start = self.clock()
+        try:
+            outcome = self.refresh(keys)
+        except Exception as e:
+            print(f"Error refreshing {keys}: {e}")
+            outcome = {}
+        elapsed = self.clock() - start
+
+        now = self.clock()
+        with self._cond:
+            for key in keys:
+                state = self._states[key]
+                state.last_run = now
+                state.last_duration = elapsed
+                state.runs += 1
+                if outcome.get(key):
+                    state.failures = 0
+                    state.last_success = now
+                    self._schedule(state, now + self._jittered(state.interval))
+                else:
+                    state.failures += 1
+                    backoff = min(REFRESH_BACKOFF_MAX, REFRESH_BACKOFF_BASE * 2 ** (state.failures - 1))
+                    self._schedule(state, now + self._jittered(backoff))
+        if self.on_batch is not None:
+            try:
+                self.on_batch(self)
+            except Exception as e:
+                print(f"Error in scheduler on_batch: {e}")
+        return outcome
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    now = self.clock()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = self._heap[0][0] - now if self._heap else None
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                keys = self._pop_due(self.clock())
+            if keys:
+                self.run_batch(keys)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def state(self):
+        """Per-key schedule state (next run, last run, failures...), soonest first."""
+        with self._cond:
+            states = [state.as_dict() for state in self._states.values()]
+        return sorted(states, key=lambda state: (state['next_run'], state['priority']))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(last_success=None):
+    """The process's scheduler; ``last_success`` is only used when it is first created."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from update_table import refresh_keys
+            _scheduler = RefreshScheduler(refresh_keys, last_success=last_success)
+        return _scheduler
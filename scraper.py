@@ -0,0 +1,157 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+import selenium
+from packaging import version
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.options import Options
+from bs4 import BeautifulSoup
+
+from fetching import fetch_all
+from config import SCRAPER_POOL_SIZE, SCRAPER_MAX_PAGES_PER_DRIVER, SCRAPER_PAGE_TIMEOUT
+
+# Check the installed Selenium version
+installed_selenium_version = selenium.__version__
+use_chrome = version.parse(installed_selenium_version) > version.parse("3.141.0")
+
+# Set up Chrome options
+chrome_options = Options()
+chrome_options.add_argument("--headless")  # Ensure GUI is off
+chrome_options.add_argument("--no-sandbox")
+chrome_options.add_argument('--disable-gpu')
+
+TABLE_SELECTOR = "table.w-full.text-\\[12px\\]"
+TABLE_CLASS = 'w-full text-[12px]'
+
+# 드라이버 바이너리 경로는 프로세스당 한 번만 확인한다
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path():
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            if use_chrome:
+                from webdriver_manager.chrome import ChromeDriverManager
+                _driver_path = ChromeDriverManager().install()
+            else:
+                from webdriver_manager.firefox import GeckoDriverManager
+                _driver_path = GeckoDriverManager().install()
+        return _driver_path
+
+
+def create_driver():
+    # Use the appropriate method to initialize the driver based on Selenium version
+    driver_path = resolve_driver_path()
+    if use_chrome:
+        # For newer versions of Selenium
+        from selenium.webdriver.chrome.service import Service
+        return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+
+    from selenium.webdriver.firefox.options import Options as FirefoxOptions
+    # Set up Firefox options
+    firefox_options = FirefoxOptions()
+    firefox_options.add_argument("--headless")  # Ensure GUI is off
+    return webdriver.Firefox(executable_path=driver_path, options=firefox_options)
+
+
+def fetch_table_html(driver, url, timeout=SCRAPER_PAGE_TIMEOUT):
+    # WebDriver will wait for a page to load by default. Let's make sure we wait for JavaScript to load.
+    driver.get(url)
+
+    # 페이지의 특정 요소가 로드될 때까지 대기
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, TABLE_SELECTOR)))
+
+    # Parse the rendered page and keep only the statistics table
+    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    table = soup.find('table', {'class': TABLE_CLASS})
+    return str(table) if table else None
+
+
+class _DriverSlot:
+    def __init__(self):
+        self.driver = None
+        self.pages = 0
+
+    def get(self, factory):
+        if self.driver is None:
+            self.driver = factory()
+            self.pages = 0
+        return self.driver
+
+    def discard(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"Error closing driver: {e}")
+        self.driver = None
+        self.pages = 0
+
+
+class DriverPool:
+    """Bounded pool of long-lived headless drivers.
+
+    A driver is recycled after ``max_pages`` page loads or as soon as it raises
+    anything other than a page timeout.
+    """
+
+    def __init__(self, size=SCRAPER_POOL_SIZE, max_pages=SCRAPER_MAX_PAGES_PER_DRIVER, driver_factory=create_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+        self._slots = queue.Queue()
+        for _ in range(size):
+            self._slots.put(_DriverSlot())
+
+    @contextmanager
+    def driver(self):
+        slot = self._slots.get()
+        try:
+            driver = slot.get(self.driver_factory)
+            try:
+                yield driver
+            except TimeoutException:
+                raise
+            except Exception:
+                # 크래시가 난 드라이버는 버리고 다음 요청에서 새로 띄운다
+                slot.discard()
+                raise
+            finally:
+                slot.pages += 1
+                if slot.driver is not None and slot.pages >= self.max_pages:
+                    slot.discard()
+        finally:
+            self._slots.put(slot)
+
+    def scrape(self, url):
+        with self.driver() as driver:
+            return fetch_table_html(driver, url)
+
+    def scrape_all(self, url_mapping, fetch=None):
+        """Fan ``url_mapping`` out over the pool; returns ``{key: ScrapeResult}``."""
+        return fetch_all(url_mapping, fetch or self.scrape, self.size, backend='selenium')
+
+    def shutdown(self):
+        for _ in range(self.size):
+            self._slots.get().discard()
+        for _ in range(self.size):
+            self._slots.put(_DriverSlot())
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+        return _pool
@@ -0,0 +1,188 @@
+"""Active-session bookkeeping for run.py.
+
+Sessions are kept in a timing wheel: each one sits in the bucket of the
+``bucket_seconds`` slot it was last seen in, so touching a session moves it
+between two sets and expiring only looks at the buckets that have aged out,
+never at every session. Every ``report_interval`` the tracker appends one
+JSON line of counts (active, new, expired) to a size-rotated log file.
+
+Under gunicorn one browser's requests reach several workers. After
+``share()`` each worker publishes a HyperLogLog sketch of its active
+sessions through the metrics shared directory. Sketches merge by taking
+the larger register, so counts are estimated over the union of every
+worker's sessions and a session is counted once whichever workers it
+reached, while what each worker writes and reads stays the same size
+however many sessions there are.
+"""
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import datetime
+import threading
+from logging.handlers import RotatingFileHandler
+
+import numpy as np
+
+from config import SESSION_TIMEOUT, SESSION_BUCKET_SECONDS, SESSION_REPORT_INTERVAL
+from config import SESSION_LOG_PATH, SESSION_LOG_MAX_BYTES, SESSION_LOG_BACKUPS, SESSION_SKETCH_PRECISION
+from metrics import write_shared, read_shared
+
+
+def session_logger(path=SESSION_LOG_PATH, max_bytes=SESSION_LOG_MAX_BYTES, backups=SESSION_LOG_BACKUPS):
+    logger = logging.getLogger('er_plot.sessions')
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def sketch(session_ids, precision=SESSION_SKETCH_PRECISION):
+    """HyperLogLog registers of ``session_ids``: the top bits of a 64-bit hash pick a register,
+    which keeps the longest run of leading zeros seen in the rest."""
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    rest_bits = 64 - precision
+    for session_id in session_ids:
+        value = int.from_bytes(hashlib.blake2b(session_id.encode('utf-8'), digest_size=8).digest(), 'big')
+        register = value >> rest_bits
+        rank = rest_bits - (value & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > registers[register]:
+            registers[register] = rank
+    return registers
+
+
+def estimate(registers):
+    m = len(registers)
+    empty = int(np.count_nonzero(registers == 0))
+    raw = 0.7213 / (1 + 1.079 / m) * m * m / float(np.sum(np.ldexp(1.0, -registers.astype(np.int64))))
+    # Linear counting is the more accurate of the two while most registers are empty
+    if raw <= 2.5 * m and empty:
+        return m * np.log(m / empty)
+    return raw
+
+
+def encode_sketch(registers):
+    return base64.b64encode(registers.tobytes()).decode('ascii')
+
+
+def decode_sketch(text):
+    return np.frombuffer(base64.b64decode(text), dtype=np.uint8)
+
+
+class SessionTracker:
+    def __init__(self, timeout=SESSION_TIMEOUT, bucket_seconds=SESSION_BUCKET_SECONDS, clock=time.monotonic):
+        self.timeout = timeout
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._bucket_of = {}  # session id -> bucket it was last seen in
+        self._buckets = {}  # bucket -> session ids
+        self._oldest_bucket = self._bucket(clock())
+        self._new = 0
+        self._expired = 0
+        self._stop = threading.Event()
+        self.shared = False
+        self._reported = None  # merged sketch at the previous report, when shared
+        self._shared_sketch = None  # this process's sketch as last written, when shared
+
+    def _bucket(self, now):
+        return int(now // self.bucket_seconds)
+
+    def touch(self, session_id):
+        """Mark ``session_id`` active now; returns True if it was not being tracked."""
+        bucket = self._bucket(self.clock())
+        with self._lock:
+            previous = self._bucket_of.get(session_id)
+            if previous == bucket:
+                return False
+            if previous is not None:
+                self._buckets[previous].discard(session_id)
+            else:
+                self._new += 1
+            self._bucket_of[session_id] = bucket
+            self._buckets.setdefault(bucket, set()).add(session_id)
+            return previous is None
+
+    def expire(self):
+        """Drop sessions not seen for ``timeout`` seconds and return how many were dropped."""
+        # A bucket expires once even its newest moment is older than the timeout
+        last_expired = self._bucket(self.clock() - self.timeout) - 1
+        expired = 0
+        with self._lock:
+            while self._oldest_bucket <= last_expired:
+                for session_id in self._buckets.pop(self._oldest_bucket, ()):
+                    del self._bucket_of[session_id]
+                    expired += 1
+                self._oldest_bucket += 1
+            self._expired += expired
+        return expired
+
+    def share(self):
+        """Count sessions over every process that called ``metrics.share_as`` and ``share``."""
+        self.shared = True
+
+    def local_sketch(self):
+        with self._lock:
+            ids = list(self._bucket_of)
+        return sketch(ids)
+
+    def merged_sketch(self):
+        """This process's sketch merged with the other processes' last shared ones."""
+        # Each process's part is as of its last write, at most a bucket old
+        registers = self._shared_sketch if self._shared_sketch is not None else self.local_sketch()
+        for others in read_shared('sessions'):
+            registers = np.maximum(registers, decode_sketch(others))
+        return registers
+
+    def active_count(self):
+        if self.shared:
+            return round(estimate(self.merged_sketch()))
+        return len(self._bucket_of)
+
+    def report(self):
+        """Counts since the previous report."""
+        if self.shared:
+            # New and expired come from the union with the previous report's sketch:
+            # |now or before| - |before| arrived, |now or before| - |now| left
+            current = self.merged_sketch()
+            previous = self._reported if self._reported is not None else np.zeros_like(current)
+            either = estimate(np.maximum(current, previous))
+            active = estimate(current)
+            counts = {'active': round(active), 'new': max(round(either - estimate(previous)), 0),
+                      'expired': max(round(either - active), 0)}
+            self._reported = current
+            return counts
+        with self._lock:
+            counts = {'active': len(self._bucket_of), 'new': self._new, 'expired': self._expired}
+            self._new = 0
+            self._expired = 0
+        return counts
+
+    def run(self, report_interval=SESSION_REPORT_INTERVAL, logger=None, report=True):
+        """Expire sessions every bucket and log counts every ``report_interval`` seconds until ``stop()``.
+
+        With ``report`` off nothing is logged; when shared, only one process logs the counts.
+        """
+        logger = (logger or session_logger()) if report else None
+        next_report = self.clock() + report_interval
+        while not self._stop.wait(self.bucket_seconds):
+            self.expire()
+            if self.shared:
+                self._shared_sketch = self.local_sketch()
+                write_shared('sessions', encode_sketch(self._shared_sketch))
+            if report and self.clock() >= next_report:
+                next_report += report_interval
+                record = {'time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'), **self.report()}
+                logger.info(json.dumps(record))
+
+    def stop(self):
+        self._stop.set()
+
+
+session_tracker = SessionTracker()
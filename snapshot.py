@@ -0,0 +1,76 @@
+"""Immutable, versioned view of the statistics database.
+
+A ``Snapshot`` is never modified after it is built. Publishing swaps the
+module-level reference in one assignment, so readers just grab
+``get_snapshot()`` without taking a lock and keep a consistent view for as
+long as they hold it. The generation number only ever increases and can be
+used as a cache key by anything derived from the data.
+"""
+import time
+import threading
+from types import MappingProxyType
+
+from aggregates import compute_aggregates
+
+
+class Snapshot:
+    __slots__ = ('generation', 'tables', 'aggregates', 'published_at')
+
+    def __init__(self, generation, tables, aggregates=None, published_at=None):
+        object.__setattr__(self, 'generation', generation)
+        object.__setattr__(self, 'tables', MappingProxyType(dict(tables)))
+        object.__setattr__(self, 'aggregates', MappingProxyType(dict(aggregates or {})))
+        object.__setattr__(self, 'published_at', published_at)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Snapshot is immutable')
+
+    def __repr__(self):
+        return f"Snapshot(generation={self.generation}, keys={len(self.tables)})"
+
+    @property
+    def ready(self):
+        return self.generation > 0
+
+
+_current = Snapshot(0, {})
+_publish_lock = threading.Lock()  # serialises writers only
+_listeners = []
+
+
+def get_snapshot():
+    return _current
+
+
+def get_generation():
+    return _current.generation
+
+
+def add_publish_listener(listener):
+    """Call ``listener(snapshot)`` after every publish, e.g. to drop derived caches."""
+    _listeners.append(listener)
+
+
+def publish(tables, generation=None):
+    """Publish a new snapshot with ``tables`` replacing the same keys of the current one.
+
+    ``generation`` lets the caller carry the snapshot store's generation over so
+    every process serving the same store agrees on it; it must move forward.
+    """
+    global _current
+    # Aggregates are computed for the new tables only, outside the writer lock
+    aggregates = {key: compute_aggregates(df) for key, df in tables.items()}
+    with _publish_lock:
+        previous = _current
+        if generation is None or generation <= previous.generation:
+            generation = previous.generation + 1
+        # 바뀌지 않은 키의 DataFrame은 이전 스냅샷과 공유한다
+        _current = Snapshot(generation, {**previous.tables, **tables},
+                            {**previous.aggregates, **aggregates}, time.time())
+        snapshot = _current
+    for listener in list(_listeners):
+        try:
+            listener(snapshot)
+        except Exception as e:
+            print(f"Error in snapshot listener: {e}")
+    return snapshot
@@ -0,0 +1,172 @@
+"""Columnar on-disk store of the parsed statistics tables.
+
+Every ``(tier, period)`` DataFrame is written as an Arrow IPC file named after
+its content fingerprint, and ``manifest.json`` lists the files that make up
+the current snapshot. Files are written to a temporary name and renamed into
+place, and the manifest is replaced last, so a reader always sees either the
+old or the new snapshot in full. A one-line ``generation`` file written after
+the manifest lets other processes poll for new snapshots without parsing it.
+"""
+import os
+import json
+import time
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+SCHEMA_VERSION = 1
+STORE_DIR = os.path.join('data', 'snapshot')
+MANIFEST_NAME = 'manifest.json'
+GENERATION_NAME = 'generation'
+
+
+class SnapshotStoreError(Exception):
+    pass
+
+
+def _entry_name(key):
+    tier, period = key
+    return f"{tier}__{period}"
+
+
+def _atomic_write_bytes(path, write):
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'wb') as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_manifest(store_dir=STORE_DIR):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        raise SnapshotStoreError(f"Corrupt manifest {path}: {e}")
+    if manifest.get('schema_version') != SCHEMA_VERSION:
+        raise SnapshotStoreError(f"Unsupported snapshot schema version {manifest.get('schema_version')}")
+    return manifest
+
+
+def _set_aside_manifest(store_dir, error):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    aside = f"{path}.corrupt.{int(time.time())}"
+    os.replace(path, aside)
+    print(f"{error}; moved it to {aside} and starting a new manifest")
+
+
+def write_tables(tables, fingerprints, store_dir=STORE_DIR, min_generation=0):
+    """Write ``{key: DataFrame}`` into the store and commit a new manifest.
+
+    Keys missing from ``tables`` keep their current files, so a refresh that
+    changed three keys only writes three files. A corrupt or incompatible
+    manifest is moved aside and a new one started; its generation continues
+    from the generation file and ``min_generation`` (the generation this
+    process serves), so readers never see the generation go back.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    try:
+        manifest = read_manifest(store_dir)
+    except SnapshotStoreError as e:
+        _set_aside_manifest(store_dir, e)
+        manifest = None
+    if manifest is None:
+        try:
+            generation = read_generation(store_dir)
+        except SnapshotStoreError:
+            generation = 0
+        manifest = {'schema_version': SCHEMA_VERSION, 'generation': max(generation, min_generation), 'entries': {}}
+
+    for key, df in tables.items():
+        fingerprint = fingerprints[key]
+        file_name = f"{_entry_name(key)}.{fingerprint[:16]}.arrow"
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        def write(file, table=table):
+            with ipc.new_file(file, table.schema) as writer:
+                writer.write_table(table)
+        _atomic_write_bytes(os.path.join(store_dir, file_name), write)
+
+        manifest['entries'][_entry_name(key)] = {
+            'key': list(key),
+            'file': file_name,
+            'fingerprint': fingerprint,
+            'rows': table.num_rows,
+            'columns': table.schema.names,
+        }
+
+    manifest['generation'] += 1
+    manifest['written_at'] = time.time()
+    payload = json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8')
+    _atomic_write_bytes(os.path.join(store_dir, MANIFEST_NAME), lambda file: file.write(payload))
+    generation = str(manifest['generation']).encode('ascii')
+    _atomic_write_bytes(os.path.join(store_dir, GENERATION_NAME), lambda file: file.write(generation))
+
+    # 매니페스트가 가리키지 않는 이전 파일 정리
+    live_files = {entry['file'] for entry in manifest['entries'].values()}
+    for name in os.listdir(store_dir):
+        if name.endswith('.arrow') and name not in live_files:
+            try:
+                os.remove(os.path.join(store_dir, name))
+            except OSError:
+                pass
+    return manifest
+
+
+def read_table(path):
+    # Memory-mapped read: numeric columns are handed to pandas without copying
+    with pa.memory_map(path, 'r') as source:
+        table = ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def read_generation(store_dir=STORE_DIR):
+    """Generation of the committed snapshot, or 0 when the store is empty."""
+    try:
+        with open(os.path.join(store_dir, GENERATION_NAME), 'r', encoding='ascii') as file:
+            return int(file.read())
+    except FileNotFoundError:
+        # Stores written before the generation file existed
+        manifest = read_manifest(store_dir)
+        return manifest['generation'] if manifest else 0
+    except ValueError as e:
+        raise SnapshotStoreError(f"Corrupt generation file in {store_dir}: {e}")
+
+
+def load_tables(store_dir=STORE_DIR, retries=1, loaded=None):
+    """Return ``({key: DataFrame}, manifest)``, or ``(None, None)`` when the store is empty.
+
+    With ``loaded``, a manifest read earlier, only the entries whose fingerprint
+    changed since are read.
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        return None, None
+    loaded_entries = loaded['entries'] if loaded else {}
+    tables = {}
+    for name, entry in manifest['entries'].items():
+        if loaded_entries.get(name, {}).get('fingerprint') == entry['fingerprint']:
+            continue
+        path = os.path.join(store_dir, entry['file'])
+        try:
+            tables[tuple(entry['key'])] = read_table(path)
+        except (OSError, pa.ArrowInvalid) as e:
+            # A writer may have committed a newer manifest and removed this file meanwhile
+            if retries > 0:
+                return load_tables(store_dir, retries - 1, loaded)
+            raise SnapshotStoreError(f"Unreadable snapshot file {path}: {e}")
+    return tables, manifest
+
+
+def load_fingerprints(store_dir=STORE_DIR):
+    try:
+        manifest = read_manifest(store_dir)
+    except SnapshotStoreError:
+        return {}
+    if manifest is None:
+        return {}
+    return {tuple(entry['key']): entry['fingerprint'] for entry in manifest['entries'].values()}
@@ -1,89 +1,30 @@
+"""The scraping side: fetch, parse and store the statistics tables.
+
+Web processes import ``live_data`` instead; this module and what it pulls in
+(BeautifulSoup, and Selenium through ``scraper``) are only loaded where
+tables are actually refreshed.
+"""
 import os
-import copy
-import threading
+import time
+import hashlib
 import pandas as pd
-import selenium
-from packaging import version
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-
-# 전역 변수에 대한 스레드 락
-database_lock = threading.Lock()
-last_update_time_lock = threading.Lock()
-
-# Check the installed Selenium version
-installed_selenium_version = selenium.__version__
-
-# Set up Chrome options
-chrome_options = Options()
-chrome_options.add_argument("--headless")  # Ensure GUI is off
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument('--disable-gpu')
-
-
-global last_update_time
-global database
 
-
-def update_table(url, local_path):
-    driver = None
-    try:
-        # Use the appropriate method to initialize the Chrome driver based on Selenium version
-        if version.parse(installed_selenium_version) > version.parse("3.141.0"):
-            # For newer versions of Selenium
-            from selenium.webdriver.chrome.service import Service
-            webdriver_service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=webdriver_service, options=chrome_options)
-        else:
-            from selenium.webdriver.firefox.options import Options as FirefoxOptions
-            from webdriver_manager.firefox import GeckoDriverManager
-            # Set up Firefox options
-            firefox_options = FirefoxOptions()
-            firefox_options.add_argument("--headless")  # Ensure GUI is off
-            # Initialize the Firefox driver
-            driver = webdriver.Firefox(executable_path=GeckoDriverManager().install(), options=firefox_options)
-
-        # WebDriver will wait for a page to load by default. Let's make sure we wait for JavaScript to load.
-        driver.get(url)
-
-        # 페이지의 특정 요소가 로드될 때까지 대기
-        wait = WebDriverWait(driver, 100)  # 최대 100초 대기
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.w-full.text-\\[12px\\]")))
-
-        # Now that the page is fully loaded, grab the page source.
-        html = driver.page_source
-
-        # Parse the HTML content of the page using BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Find the table with the specific class
-        table = soup.find('table', {'class': 'w-full text-[12px]'})
-
-        # Save the table to an HTML file
-        if table:
-            with open(local_path, 'w', encoding='utf-8') as file:
-                file.write(str(table))
-        else:
-            print('Table not found')
-    except Exception as e:
-        print(f"Error updating table: {e}")
-    finally:
-        if driver:
-            driver.quit()
+import live_data
+from snapshot import publish, get_snapshot
+# Kept importable from here for existing callers
+from live_data import get_last_update_time, get_database, load_last_update_time  # noqa: F401
 
 
 def parse_html(file_path):
     # Since the format of the data in the file is unknown, I will first open the file and read its content to understand its structure.
     with open(file_path, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
+        return parse_table(file.read())
 
+
+def parse_table(table_html):
+    from bs4 import BeautifulSoup
     # Using BeautifulSoup to parse the HTML content
-    soup = BeautifulSoup("".join(lines), 'html.parser')
+    soup = BeautifulSoup(table_html, 'html.parser')
 
     # Finding all rows in the table
     rows = soup.find_all('tr')
@@ -131,25 +72,132 @@ def parse_html(file_path):
     return df
 
 
-def update_table_all():
+def fetch_tables(url_mapping):
+    from config import FETCH_BACKEND
+    from fetching import report_scrape_times
+    results = {}
+    if FETCH_BACKEND == 'http':
+        from http_fetch import fetch_all_tables
+        results = fetch_all_tables(url_mapping)
+
+    # HTTP로 못 가져온 키만 드라이버 풀로 다시 가져온다
+    remaining = {key: url for key, url in url_mapping.items() if key not in results or not results[key].ok}
+    if remaining:
+        from scraper import get_driver_pool
+        results.update(get_driver_pool().scrape_all(remaining))
+    report_scrape_times(results)
+    return results
+
+
+def table_fingerprint(table_html):
+    return hashlib.sha256(table_html.encode('utf-8')).hexdigest()
+
+
+def raw_html_path(key):
+    return os.path.join('data', f"{str(key)}.html")
+
+
+def diff_tables(results):
+    """Return ``{key: table_html}`` for the fetched tables whose content changed."""
+    from config import KEEP_RAW_HTML
+    from snapshot_store import load_fingerprints
+
+    fingerprints = load_fingerprints()
+    changed = {}
+    for key, result in results.items():
+        if not result.ok or fingerprints.get(key) == table_fingerprint(result.html):
+            continue
+        changed[key] = result.html
+        if KEEP_RAW_HTML:
+            # 원본 HTML은 보관용으로만 남긴다
+            with open(raw_html_path(key), 'w', encoding='utf-8') as file:
+                file.write(result.html)
+
+    unchanged = [key for key, result in results.items() if result.ok and key not in changed]
+    print(f"[refresh] changed: {list(changed) or 'none'} / unchanged: {len(unchanged)} / failed: {len(results) - len(changed) - len(unchanged)}")
+    return changed
+
+
+def publish_tables(tables, generation=None):
+    # 바뀐 키만 새 스냅샷에 교체하고 나머지 프레임은 그대로 공유한다
+    return publish(tables, generation)
+
+
+def ingest_tables(changed_tables):
+    """Parse ``{key: table_html}``, persist it to the snapshot store and swap it into the live database."""
+    from snapshot_store import write_tables
+    from metrics import parse_duration
+    try:
+        parsed = {}
+        for key, table_html in changed_tables.items():
+            start = time.perf_counter()
+            parsed[key] = parse_table(table_html)
+            parse_duration.observe(time.perf_counter() - start, tier=key[0], period=key[1])
+        fingerprints = {key: table_fingerprint(table_html) for key, table_html in changed_tables.items()}
+        manifest = write_tables(parsed, fingerprints, min_generation=get_snapshot().generation)
+        publish_tables(parsed, manifest['generation'])
+        live_data.loaded_manifest = manifest
+    except Exception as e:
+        print(f"Error ingesting tables: {e}")
+        return False
+
+    # 히스토리 기록 실패가 현재 데이터 갱신을 막지 않도록 따로 처리
+    from history_store import get_history_store
+    try:
+        get_history_store().append(parsed)
+    except Exception as e:
+        print(f"Error appending history: {e}")
+    return True
+
+
+def refresh_keys(keys):
+    """Fetch, diff and ingest ``keys``; returns ``{key: succeeded}`` for the scheduler."""
     from config import url_mapping
-    basepath = "data/"
+    results = fetch_tables({key: url_mapping[key] for key in keys})
+    changed = diff_tables(results)
+    ingested = ingest_tables(changed) if changed else True
+    if any(result.ok for result in results.values()):
+        update_last_time()
+    return {key: result.ok and (ingested or key not in changed) for key, result in results.items()}
 
-    for key, url in url_mapping.items():
-        update_table(url, os.path.join(basepath, f"{str(key)}.html"))
+
+def rebuild_store_from_raw_html():
+    from config import url_mapping
+    tables = {}
+    for key in url_mapping:
+        # A fresh install has none of these; whatever is missing is fetched by the caller
+        try:
+            with open(raw_html_path(key), 'r', encoding='utf-8') as file:
+                tables[key] = file.read()
+        except FileNotFoundError:
+            continue
+    if tables:
+        ingest_tables(tables)
+
+
+def missing_keys(url_mapping=None):
+    """The url_mapping keys the live snapshot has no table for."""
+    if url_mapping is None:
+        from config import url_mapping
+    tables = get_snapshot().tables
+    return [key for key in url_mapping if key not in tables]
 
 
 # 전역변수 database 갱신 함수
 def update_database():
-    from config import url_mapping
-    global database
+    """Load the live database from the snapshot store, rebuilding the store from data/*.html if needed."""
+    from snapshot_store import load_tables, SnapshotStoreError
     try:
-        database_ = {}
-        for key, url in url_mapping.items():
-            tier, version = key
-            database_[key] = parse_html(os.path.join('data', f"('{tier}', '{version}').html"))
-        with database_lock:
-            database = copy.deepcopy(database_)
+        try:
+            tables, manifest = load_tables()
+        except SnapshotStoreError as e:
+            print(f"Snapshot store unusable, rebuilding from raw HTML: {e}")
+            tables = None
+        if tables is None:
+            rebuild_store_from_raw_html()
+        else:
+            publish_tables(tables, manifest['generation'])
+            live_data.loaded_manifest = manifest
     except Exception as e:
         print(f"Error updating database: {e}")
 
@@ -157,7 +205,6 @@ def update_database():
 def update_last_time():
     from datetime import datetime
     import pytz
-    global last_update_time
     # 현재 시간을 UTC+9 시간대로 변환
     tz = pytz.timezone('Asia/Tokyo')  # UTC+9 시간대
     now = datetime.now(tz)
@@ -165,33 +212,21 @@ def update_last_time():
     # 형식에 맞게 시간을 문자열로 변환
     time_str = now.strftime("%Y/%m/%d %H:%M UTC+9")
 
-    with last_update_time_lock:
-        last_update_time = copy.deepcopy(time_str)
+    live_data.last_update_time = time_str
 
     # 파일에 기록
-    with open('data/last_update_time.txt', 'w', encoding='utf-8') as f:
+    with open(live_data.LAST_UPDATE_PATH, 'w', encoding='utf-8') as f:
         f.write(time_str)
 
 
-# update_table을 주기적으로 실행하는 함수
+# 키별 주기에 맞춰 테이블을 갱신하는 함수
 def run_periodic_update():
-    import time
-    while True:
-        time.sleep(10800)  # 3시간 대기 (3시간 = 10800초)
-        update_table_all()
-        update_database()
-        update_last_time()
-
-
-def get_last_update_time():
-    with last_update_time_lock:
-        return last_update_time
-
-def get_database():
-    with database_lock:
-        return database
-
+    from scheduler import get_scheduler
+    get_scheduler().run()
 
 
 if __name__ == '__main__':
-    update_table_all()
+    # Refresh every table once into the snapshot store, like ``ingest_daemon.py --once``
+    from config import url_mapping
+    update_database()
+    refresh_keys(list(url_mapping))
@@ -0,0 +1,56 @@
+"""Production entry point: the Dash server as a WSGI application for gunicorn.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+gunicorn.conf.py preloads this module in the master process, starts
+ingest_daemon.py once next to it (restarting it if it exits) and calls
+``start_worker_threads`` in every worker after the fork. Scraping never runs in a worker: each worker holds its
+own snapshot and reloads it from the snapshot store when the daemon commits a
+new generation. A worker whose store is missing or unreadable still starts and
+answers with the "data loading" page (and 503 on /ready) until the daemon
+commits one. ``python run.py`` is still the single-process development
+server.
+"""
+import threading
+
+import metrics
+from run import server, safe_run_session_tracker, run_cache_warmer
+from config import SESSION_LOG_PATH
+from session_tracker import session_logger, session_tracker
+from live_data import reload_snapshot_store, watch_snapshot_store, load_last_update_time
+
+application = server
+
+
+def load_snapshot():
+    # Called in the master before forking so workers start with the tables already in memory
+    try:
+        reload_snapshot_store()
+        load_last_update_time()
+    except Exception as e:
+        print(f"Error loading snapshot store: {e}")
+
+
+def start_worker_threads(slot=0):
+    """Start the per-process background threads; call once in each worker after the fork.
+
+    ``slot`` numbers the workers from 0 and is reused by a worker's
+    replacement: it names the worker's shared metrics and session files, and
+    slot 0 writes the session log for all of them.
+    """
+    # Counters and sessions are merged over every worker, whichever one answers /metrics
+    metrics.share_as(f"worker{slot}")
+    session_tracker.share()
+    if slot == 0:
+        session_logger(SESSION_LOG_PATH)
+
+    # Threads do not survive fork
+    reload_thread = threading.Thread(target=watch_snapshot_store, daemon=True)
+    reload_thread.start()
+    expiration_thread = threading.Thread(target=safe_run_session_tracker, args=(slot == 0,), daemon=True)
+    expiration_thread.start()
+    dump_thread = threading.Thread(target=metrics.run_dumper, daemon=True)
+    dump_thread.start()
+    # Caches are per worker; one loaded in the master is warmed here, after the fork
+    warm_up_thread = threading.Thread(target=run_cache_warmer, daemon=True)
+    warm_up_thread.start()